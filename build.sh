@@ -5,3 +5,5 @@ set -o errexit
 pip install -r requirements.txt
 python manage.py collectstatic --no-input
 python manage.py migrate
+python manage.py rebuild_search_index
+python manage.py rebuild_revenue_rollup
@@ -4,3 +4,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kegama_residences.settings')
 
 application = get_asgi_application()
+
+from management.scheduler import start_scheduler
+
+start_scheduler()
@@ -0,0 +1,254 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+_MISSING = object()
+
+
+def build_backend(config):
+    """Instantiates a cache backend from a CACHES-style dict without registering it."""
+    config = dict(config)
+    backend = import_string(config.pop('BACKEND'))
+    return backend(config.pop('LOCATION', ''), config)
+
+
+class TieredCache(BaseCache):
+    """
+    An in-process LRU in front of a shared backend (OPTIONS['SHARED'], any
+    CACHES entry). Reads are answered locally for at most LOCAL_TIMEOUT
+    seconds, so another worker's write shows up within that window. Writes,
+    add() and incr() always go to the shared backend, which keeps counters
+    (rate limits, change versions) exact across workers.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared = build_backend(options['SHARED'])
+        self.local_timeout = float(options.get('LOCAL_TIMEOUT', 1))
+        self.local_max_entries = int(options.get('LOCAL_MAX_ENTRIES', 1000))
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, key, version):
+        return self.shared.make_and_validate_key(key, version=version)
+
+    def _local_get(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return _MISSING
+            pickled, expires = entry
+            if expires <= time.monotonic():
+                del self._local[key]
+                return _MISSING
+            self._local.move_to_end(key)
+        # Stored pickled, like LocMemCache, so callers never share a mutable value
+        return pickle.loads(pickled)
+
+    def _local_set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        ttl = self.local_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            self._local_delete(key)
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._local[key] = (pickled, time.monotonic() + ttl)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, key):
+        with self._lock:
+            self._local.pop(key, None)
+
+    def get(self, key, default=None, version=None):
+        local_key = self._key(key, version)
+        value = self._local_get(local_key)
+        if value is _MISSING:
+            value = self.shared.get(key, _MISSING, version=version)
+            if value is _MISSING:
+                return default
+            self._local_set(local_key, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        found, missing = {}, []
+        for key in keys:
+            value = self._local_get(self._key(key, version))
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            fetched = self.shared.get_many(missing, version=version)
+            for key, value in fetched.items():
+                self._local_set(self._key(key, version), value)
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self._local_set(self._key(key, version), value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self._local_set(self._key(key, version), value, timeout)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._local_set(self._key(key, version), value, timeout)
+        else:
+            self._local_delete(self._key(key, version))
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        self._local_set(self._key(key, version), value)
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._local_delete(self._key(key, version))
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._local_delete(self._key(key, version))
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._local_delete(self._key(key, version))
+        self.shared.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        if self._local_get(self._key(key, version)) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+
+class SQLiteCache(BaseCache):
+    """
+    Cache table in a standalone SQLite file (WAL mode) that every process on
+    the host opens. add() and incr() are single statements or IMMEDIATE
+    transactions, so they stay atomic across workers.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.path = location
+        self._connections = threading.local()
+
+    def _db(self):
+        db = getattr(self._connections, 'db', None)
+        if db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)')
+            self._connections.db = db
+        return db
+
+    def _fetch(self, key):
+        row = self._db().execute(
+            'SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)', (key, time.time()),
+        ).fetchone()
+        return _MISSING if row is None else pickle.loads(row[0])
+
+    def get(self, key, default=None, version=None):
+        value = self._fetch(self.make_and_validate_key(key, version=version))
+        return default if value is _MISSING else value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        expires = self.get_backend_timeout(timeout)
+        if expires is not None and expires <= time.time():
+            self._db().execute('DELETE FROM cache WHERE key = ?', (key,))
+            return
+        self._db().execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires),
+        )
+        self._cull()
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        cursor = self._db().execute(
+            'INSERT INTO cache (key, value, expires) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires '
+            'WHERE cache.expires IS NOT NULL AND cache.expires <= ?',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self.get_backend_timeout(timeout), now),
+        )
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        db = self._db()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            value = self._fetch(key)
+            if value is _MISSING:
+                raise ValueError(f"Key '{key}' not found")
+            value += delta
+            db.execute('UPDATE cache SET value = ? WHERE key = ?', (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key))
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._db().execute(
+            'UPDATE cache SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), key, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._db().execute('DELETE FROM cache WHERE key = ?', (key,)).rowcount == 1
+
+    def has_key(self, key, version=None):
+        return self._fetch(self.make_and_validate_key(key, version=version)) is not _MISSING
+
+    def clear(self):
+        self._db().execute('DELETE FROM cache')
+
+    def _cull(self):
+        db = self._db()
+        if db.execute('SELECT COUNT(*) FROM cache').fetchone()[0] <= self._max_entries:
+            return
+        db.execute('DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?', (time.time(),))
+        count = db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count > self._max_entries:
+            # Soonest-expiring first; keys without a timeout go last
+            db.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires IS NULL, expires LIMIT ?)',
+                (count // self._cull_frequency,),
+            )
+
+    def close(self, **kwargs):
+        # Connections are per thread and reused across requests
+        pass
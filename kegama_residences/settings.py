@@ -1,4 +1,8 @@
+import atexit
 import os
+import shutil
+import sys
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -94,12 +98,81 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-    }
+# Cache: 'file', 'sqlite' (default) and 'redis' are shared by every worker,
+# with a short-lived in-process LRU in front (kegama_residences/cache.py).
+# 'redis' needs `pip install redis` and any Redis-protocol server at
+# CACHE_LOCATION. 'locmem' is private to each worker process, so rate limits,
+# job locks and change versions are not shared; use it only for development.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'sqlite').lower()
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION')
+if sys.argv[1:2] == ['test'] and CACHE_BACKEND != 'locmem':
+    # Tests clear the cache: give each run its own, never the live one
+    CACHE_BACKEND = 'sqlite' if CACHE_BACKEND == 'redis' else CACHE_BACKEND
+    test_cache_dir = tempfile.mkdtemp(prefix='kegama-test-cache-')
+    atexit.register(shutil.rmtree, test_cache_dir, ignore_errors=True)
+    CACHE_LOCATION = os.path.join(test_cache_dir, 'cache')
+SHARED_CACHE_BACKENDS = {
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'kegama-cache'),
+    },
+    'sqlite': {
+        'BACKEND': 'kegama_residences.cache.SQLiteCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'kegama-cache.sqlite3'),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/0',
+    },
 }
+if CACHE_BACKEND == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+        }
+    }
+elif CACHE_BACKEND in SHARED_CACHE_BACKENDS:
+    shared_cache = dict(SHARED_CACHE_BACKENDS[CACHE_BACKEND])
+    shared_cache['LOCATION'] = CACHE_LOCATION or shared_cache['LOCATION']
+    if CACHE_BACKEND != 'redis':
+        shared_cache['OPTIONS'] = {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '10000'))}
+    CACHES = {
+        'default': {
+            'BACKEND': 'kegama_residences.cache.TieredCache',
+            'OPTIONS': {
+                'SHARED': shared_cache,
+                'LOCAL_TIMEOUT': float(os.environ.get('CACHE_LOCAL_TIMEOUT', '1')),
+                'LOCAL_MAX_ENTRIES': int(os.environ.get('CACHE_LOCAL_MAX_ENTRIES', '1000')),
+            },
+        }
+    }
+else:
+    raise ValueError(f"CACHE_BACKEND must be one of locmem, {', '.join(SHARED_CACHE_BACKENDS)}")
+
+# Background jobs (management/scheduler.py). Disable when an external cron
+# runs `manage.py purge_expired_registrations` instead.
+BACKGROUND_JOBS_ENABLED = os.environ.get('BACKGROUND_JOBS_ENABLED', 'True').lower() == 'true'
+PENDING_REGISTRATION_TTL_MINUTES = int(os.environ.get('PENDING_REGISTRATION_TTL_MINUTES', '60'))
+PURGE_INTERVAL_SECONDS = int(os.environ.get('PURGE_INTERVAL_SECONDS', '300'))
+PURGE_BATCH_SIZE = 500
+# Room AVAILABLE/OCCUPIED flips as stays start and end (management/rack.py)
+ROOM_RECONCILE_INTERVAL_SECONDS = int(os.environ.get('ROOM_RECONCILE_INTERVAL_SECONDS', '60'))
+
+# Rendered guest registration PDFs, keyed by content hash (management/pdf_cache.py)
+PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'kegama-pdf-cache'))
+PDF_CACHE_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))
+
+# PDF rendering runs in a process pool per web worker (management/pdf.py).
+# A sync worker renders one PDF at a time, so one renderer per worker is
+# enough; set PDF_RENDER_WORKERS=0 to render in-process. PDF_RENDER_QUEUE_SIZE
+# bounds renders across all workers (slots in the shared cache).
+PDF_RENDER_WORKERS = int(os.environ.get('PDF_RENDER_WORKERS', '1'))
+PDF_RENDER_QUEUE_SIZE = int(os.environ.get('PDF_RENDER_QUEUE_SIZE', '4'))
+PDF_RENDER_TIMEOUT = int(os.environ.get('PDF_RENDER_TIMEOUT', '60'))
+PDF_RETRY_AFTER = 5
+# Most registration forms one batch print may contain
+PDF_BATCH_LIMIT = int(os.environ.get('PDF_BATCH_LIMIT', '100'))
 
 SESSION_COOKIE_AGE = 60 * 60 * 24 * 365  # 3 months
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
@@ -129,6 +202,11 @@ LOGGING = {
             'level': 'WARNING',
             'propagate': False,
         },
+        'management': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
     'root': {
         'handlers': ['console'],
@@ -4,3 +4,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kegama_residences.settings')
 
 application = get_wsgi_application()
+
+from management.scheduler import start_scheduler
+
+start_scheduler()
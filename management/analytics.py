@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek, TruncYear
+from django.utils import timezone
+
+from .conditional import change_version
+from .occupancy import OccupancyMatrix
+from .rollup import revenue_series
+
+GRANULARITIES = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'year': TruncYear,
+}
+# The analytics page's filter tabs: how far back each looks, and its bucket size
+FILTERS = {
+    'daily': (timedelta(days=30), 'day'),
+    'weekly': (timedelta(weeks=52), 'week'),
+    'monthly': (timedelta(days=365), 'month'),
+    'yearly': (timedelta(days=365 * 5), 'year'),
+}
+MAX_RANGE_DAYS = 366 * 10
+# Keys carry the change version, so writes retire entries before this runs out
+CACHE_TIMEOUT = 60 * 10
+
+
+def filter_range(filter_type):
+    """(start, end, granularity) for one of the FILTERS, ending today."""
+    span, granularity = FILTERS.get(filter_type, FILTERS['daily'])
+    end = timezone.localdate()
+    return end - span, end, granularity
+
+
+def timeseries(start, end, granularity):
+    """
+    Gross revenue and guests (DailyRevenue) next to room-nights, occupancy,
+    ADR and RevPAR (OccupancyMatrix) per period, plus totals for the range.
+    """
+    gross = {row['date']: row for row in revenue_series(start, GRANULARITIES[granularity], end=end)}
+    matrix = OccupancyMatrix(start, end)
+
+    series = []
+    for kpis in matrix.by_period(granularity):
+        row = gross.get(kpis['date'], {})
+        series.append({
+            'date': kpis['date'],
+            'revenue': float(row.get('revenue') or 0),
+            'guests': row.get('guests') or 0,
+            'room_nights': kpis['room_nights'],
+            'available_room_nights': kpis['available_room_nights'],
+            'room_revenue': kpis['revenue'],
+            'occupancy': kpis['occupancy'],
+            'adr': kpis['adr'],
+            'revpar': kpis['revpar'],
+        })
+
+    summary = matrix.summary()
+    summary['room_revenue'] = summary.pop('revenue')
+    summary['revenue'] = sum(row['revenue'] for row in series)
+    summary['guests'] = sum(row['guests'] for row in series)
+    return {
+        'start': start,
+        'end': end,
+        'granularity': granularity,
+        'summary': summary,
+        'series': series,
+    }
+
+
+def cached_timeseries(start, end, granularity):
+    key = f"analytics:{change_version()}:{start}:{end}:{granularity}"
+    data = cache.get(key)
+    if data is None:
+        data = timeseries(start, end, granularity)
+        cache.set(key, data, CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.db.models import Exists, F, OuterRef
+
+from .models import GuestRegistration, Room
+
+# Booking form durations: hours -> the Room field holding that rate
+RATE_FIELDS = {
+    6: 'price_6hr',
+    10: 'price_10hr',
+    22: 'price',
+}
+MAX_NIGHTS = 90
+
+
+def requested_range(check_in, nights=1, hours=22):
+    """Check-in and check-out day of a new booking; short stays check out the same day."""
+    if hours == 22:
+        return check_in, check_in + timedelta(days=nights)
+    return check_in, check_in
+
+
+def stays_overlapping(check_in, check_out):
+    """
+    Stays that are not checked out and overlap [check_in, check_out), the
+    same test update_guest's conflict warning uses: a room is bookable on
+    the day its guest checks out, and same-day short stays do not collide.
+    """
+    return GuestRegistration.objects.exclude(status='CHECKED_OUT').filter(
+        check_in_date__lt=check_out, check_out_date__gt=check_in,
+    )
+
+
+def free_rooms(check_in, nights=1, hours=22, pax=1, exclude=None):
+    """
+    Rooms out of maintenance that seat `pax` and have no stay overlapping the
+    request, with the rate for its duration. One query: a NOT EXISTS per room
+    over the partial guest_active_stay_idx.
+    """
+    check_in, check_out = requested_range(check_in, nights, hours)
+    busy = stays_overlapping(check_in, check_out).filter(room_number=OuterRef('number'))
+    if exclude:
+        busy = busy.exclude(id=exclude)
+
+    rooms = Room.objects.exclude(status='MAINTENANCE').filter(~Exists(busy), capacity__gte=pax).annotate(
+        rate=F(RATE_FIELDS[hours]),
+    ).order_by('floor', 'number').values('number', 'floor', 'capacity', 'rate')
+    return check_in, check_out, [{**room, 'rate': float(room['rate'])} for room in rooms]
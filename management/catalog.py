@@ -0,0 +1,73 @@
+import copy
+import threading
+import time
+
+from .conditional import bump_cache_version, cache_version, local_copy_expired
+from .models import Room
+
+CATALOG_VERSION_KEY = 'room_catalog_version'
+
+
+class RoomCatalog:
+    """Every Room, ordered by floor and number, with amenities prefetched."""
+
+    def __init__(self, rooms):
+        self._rooms = list(rooms)
+        self._by_number = {room.number: room for room in self._rooms}
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def numbers(self):
+        return list(self._by_number)
+
+    def rooms(self, exclude_status=None):
+        """
+        Copies of the cached rooms (views annotate them per request), so
+        amenities and every field read without a query.
+        """
+        return [copy.copy(room) for room in self._rooms if room.status != exclude_status]
+
+    def by_floor(self, exclude_status=None):
+        grouped = {}
+        for room in self.rooms(exclude_status):
+            grouped.setdefault(room.floor, []).append(room)
+        return grouped
+
+    def get(self, number):
+        room = self._by_number.get(number)
+        return copy.copy(room) if room is not None else None
+
+
+def load_catalog():
+    return RoomCatalog(Room.objects.order_by('floor', 'number').prefetch_related('amenities'))
+
+
+def catalog_version():
+    return cache_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    bump_cache_version(CATALOG_VERSION_KEY)
+
+
+_catalog = None
+_catalog_version = None
+_catalog_loaded_at = 0.0
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """
+    This process's RoomCatalog, reloaded once after any Room or Amenity
+    write. Queryset .update()/bulk_update callers must bump_catalog_version().
+    Without a shared cache it is also reloaded every UNSHARED_RELOAD_SECONDS.
+    """
+    global _catalog, _catalog_version, _catalog_loaded_at
+    version = catalog_version()
+    with _catalog_lock:
+        if _catalog is None or _catalog_version != version or local_copy_expired(_catalog_loaded_at):
+            _catalog = load_catalog()
+            _catalog_version = version
+            _catalog_loaded_at = time.monotonic()
+        return _catalog
@@ -0,0 +1,105 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+CHANGE_VERSION_KEY = 'change_version'
+# How long a per-process copy may be served when the version keys that would
+# retire it cannot reach other workers (cache_is_shared() is False)
+UNSHARED_RELOAD_SECONDS = 1.0
+
+
+def cache_is_shared():
+    """
+    Whether the default cache is seen by every worker. LocMemCache and
+    DummyCache live in one process, so a bump_cache_version() there never
+    reaches the others.
+    """
+    backend = caches['default']
+    backend = getattr(backend, 'shared', backend)  # TieredCache
+    return not isinstance(backend, (LocMemCache, DummyCache))
+
+
+def local_copy_expired(loaded_at):
+    """
+    For per-process copies retired by a version key: True once a copy loaded
+    at time.monotonic() `loaded_at` must be re-read regardless of the version,
+    which is after UNSHARED_RELOAD_SECONDS unless the cache is shared.
+    """
+    return not cache_is_shared() and time.monotonic() - loaded_at >= UNSHARED_RELOAD_SECONDS
+
+
+def cache_version(key, fresh=False):
+    """
+    Shared token stored under `key`; moves on every bump_cache_version(key).
+    fresh=True reads past TieredCache's in-process tier, so a bump in another
+    worker is seen at once rather than up to LOCAL_TIMEOUT later.
+    """
+    backend = caches['default']
+    if fresh:
+        backend = getattr(backend, 'shared', backend)
+    version = backend.get(key)
+    if version is None:
+        # Seed from the clock so a cold cache never reissues an old token
+        version = time.time_ns()
+        backend.add(key, version, None)
+        version = backend.get(key, version)
+    return version
+
+
+def bump_cache_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def change_version():
+    """Token that moves whenever a GuestRegistration, Room or AuditLog row changes."""
+    return cache_version(CHANGE_VERSION_KEY)
+
+
+def bump_change_version():
+    bump_cache_version(CHANGE_VERSION_KEY)
+
+
+def poll_etag(request, *args, **kwargs):
+    """
+    ETag for a polled manager view. Besides the change version it covers the
+    URL, whether this is an HTMX partial, the business date and the session /
+    CSRF identity baked into the rendered forms.
+    """
+    if not request.session.get('is_manager'):
+        return None
+
+    parts = [
+        str(change_version()),
+        timezone.localdate().isoformat(),
+        request.get_full_path(),
+        'hx' if request.headers.get('HX-Request') else 'page',
+        request.session.session_key or '',
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    ]
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+
+def conditional_poll(view_func):
+    """Answers If-None-Match with 304 before the view touches the database."""
+    conditional_view = condition(etag_func=poll_etag)(view_func)
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        if response.has_header('ETag'):
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('HX-Request',))
+        return response
+
+    return wrapper
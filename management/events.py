@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+from django.core.cache import cache
+
+TOPICS = ('guests', 'rooms')
+EVENT_KEY = 'events:{topic}'
+CHECK_INTERVAL = 0.5
+KEEPALIVE_INTERVAL = 15
+# Streams end after this long; EventSource reconnects on its own, which keeps
+# dead connections from piling up behind proxies.
+STREAM_LIFETIME = 60 * 5
+RETRY_MS = 3000
+
+
+def publish(topic):
+    """Marks `topic` as changed for every connected live_events stream."""
+    key = EVENT_KEY.format(topic=topic)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+async def _versions(topics):
+    keys = {EVENT_KEY.format(topic=topic): topic for topic in topics}
+    values = await cache.aget_many(keys)
+    return {topic: values.get(key, 0) for key, topic in keys.items()}
+
+
+def _event(topic, version):
+    return f"event: {topic}\ndata: {version}\n\n"
+
+
+async def event_stream(topics, lifetime=STREAM_LIFETIME):
+    """
+    Server-Sent Events for the given topics. Every topic is sent once on
+    connect so a reconnecting screen catches up on anything it missed; the
+    views it refreshes answer 304 when nothing actually changed.
+
+    Change counters live in the default cache, so publishers in other worker
+    processes are only seen when that cache is shared between them.
+    """
+    yield f"retry: {RETRY_MS}\n\n"
+
+    seen = await _versions(topics)
+    for topic, version in seen.items():
+        yield _event(topic, version)
+
+    started = last_sent = time.monotonic()
+    while time.monotonic() - started < lifetime:
+        await asyncio.sleep(CHECK_INTERVAL)
+        current = await _versions(topics)
+        for topic, version in current.items():
+            if version != seen[topic]:
+                yield _event(topic, version)
+                last_sent = time.monotonic()
+        seen = current
+
+        if time.monotonic() - last_sent >= KEEPALIVE_INTERVAL:
+            yield ": keepalive\n\n"
+            last_sent = time.monotonic()
@@ -0,0 +1,129 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import AuditLog, GuestRegistration
+
+EXPORT_CHUNK_SIZE = 2000
+# Leading characters a spreadsheet would read as a formula (CSV injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+# Rows joined into one chunk of the response body
+ROWS_PER_WRITE = 500
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+DATASETS = {
+    'guests': {
+        'model': GuestRegistration,
+        'date_field': 'created_at',
+        'filter_field': 'status',
+        'choices': GuestRegistration.STATUS_CHOICES,
+    },
+    'audit-log': {
+        'model': AuditLog,
+        'date_field': 'timestamp',
+        'filter_field': 'action',
+        'choices': AuditLog.ACTION_CHOICES,
+    },
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def export_rows(dataset, start=None, end=None, value=None):
+    """
+    (columns, rows) for one of DATASETS: every concrete field, oldest first,
+    restricted to local dates start..end (inclusive) and to one status/action.
+    Rows come off a chunked iterator, so memory stays flat at any size.
+    """
+    spec = DATASETS.get(dataset)
+    if spec is None:
+        raise ExportError(f"Unknown dataset {dataset!r}")
+    model, date_field = spec['model'], spec['date_field']
+    if value and value not in dict(spec['choices']):
+        raise ExportError(f"Unknown {spec['filter_field']} {value!r}")
+
+    columns = [f.attname for f in model._meta.concrete_fields]
+    queryset = model.objects.all()
+    if start:
+        queryset = queryset.filter(**{f'{date_field}__gte': _day_start(start)})
+    if end:
+        queryset = queryset.filter(**{f'{date_field}__lt': _day_start(end + timedelta(days=1))})
+    if value:
+        queryset = queryset.filter(**{spec['filter_field']: value})
+
+    rows = queryset.order_by(date_field, 'pk').values_list(*columns).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    return columns, rows
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """File-like object whose write() just hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_cell(value) for value in row])
+
+
+def jsonl_lines(columns, rows):
+    for row in rows:
+        record = {column: timezone.localtime(value) if isinstance(value, datetime) else value
+                  for column, value in zip(columns, row)}
+        yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
+
+
+def render_lines(fmt, columns, rows):
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown format {fmt!r}")
+    return csv_lines(columns, rows) if fmt == 'csv' else jsonl_lines(columns, rows)
+
+
+def chunked(lines, size=ROWS_PER_WRITE):
+    """Joins lines into larger writes."""
+    lines = iter(lines)
+    while True:
+        chunk = ''.join(islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def achunked(lines, size=ROWS_PER_WRITE):
+    """
+    chunked() for ASGI, which would otherwise buffer a synchronous iterator
+    in full. Every chunk is pulled on the same sync thread as the cursor.
+    """
+    lines = iter(lines)
+    next_chunk = sync_to_async(lambda: ''.join(islice(lines, size)), thread_sensitive=True)
+    while True:
+        chunk = await next_chunk()
+        if not chunk:
+            return
+        yield chunk
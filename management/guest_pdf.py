@@ -0,0 +1,83 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from . import pdf_cache
+from .models import GuestRegistration
+
+TEMPLATE = 'pdf/guest_registration.html'
+BATCH_TEMPLATE = 'pdf/guest_registration_batch.html'
+FORM_TEMPLATE = 'pdf/partials/guest_registration_form.html'
+STYLESHEET = 'guest_registration.css'
+
+
+def form_context(guest):
+    """Per-guest values the registration form prints besides the guest itself."""
+    try:
+        requests_list = json.loads(guest.additional_requests)
+    except (TypeError, ValueError):
+        requests_list = []
+
+    room_total = float(guest.room_rate or 0) * int(guest.nights or 1)
+    requests_total = sum(float(r.get('price', 0)) for r in requests_list)
+    return {
+        'guest': guest,
+        'requests_list': requests_list,
+        'room_total': room_total,
+        'requests_total': requests_total,
+        'grand_total': room_total + requests_total,
+    }
+
+
+def render_html(guest, policy_text):
+    return render_to_string(TEMPLATE, {
+        **form_context(guest),
+        'base_dir': settings.BASE_DIR,
+        'policy_text': policy_text,
+    })
+
+
+def guest_key(guest, policy_text, print_date):
+    return pdf_cache.guest_pdf_key(guest, policy_text, (TEMPLATE, FORM_TEMPLATE), STYLESHEET, print_date)
+
+
+class BatchTooLarge(ValueError):
+    def __init__(self, count):
+        self.count = count
+        super().__init__(f"{count} registrations match; a batch prints at most {settings.PDF_BATCH_LIMIT}")
+
+
+def batch_guests(day=None, status=None):
+    """
+    Registrations for a batch print: check-ins on `day` and/or in `status`.
+    Raises BatchTooLarge rather than cutting the batch at PDF_BATCH_LIMIT.
+    """
+    guests = GuestRegistration.objects.all()
+    if day is not None:
+        guests = guests.filter(check_in_date=day)
+    if status:
+        guests = guests.filter(status=status)
+    limit = settings.PDF_BATCH_LIMIT
+    batch = list(guests.order_by('room_number', 'last_name', 'first_name')[:limit + 1])
+    if len(batch) > limit:
+        raise BatchTooLarge(guests.count())
+    return batch
+
+
+def render_batch_html(guests, policy_text):
+    """All forms in one document, so WeasyPrint lays the batch out in a single pass."""
+    return render_to_string(BATCH_TEMPLATE, {
+        'forms': [form_context(guest) for guest in guests],
+        'base_dir': settings.BASE_DIR,
+        'policy_text': policy_text,
+    })
+
+
+def batch_key(guests, policy_text, print_date):
+    digest = hashlib.sha256(BATCH_TEMPLATE.encode())
+    digest.update(pdf_cache.template_version(BATCH_TEMPLATE).encode())
+    for guest in guests:
+        digest.update(guest_key(guest, policy_text, print_date).encode())
+    return digest.hexdigest()
@@ -0,0 +1,175 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from itertools import accumulate
+from typing import NamedTuple
+
+from .conditional import bump_cache_version, cache_version, local_copy_expired
+from .models import GuestRegistration
+from .occupancy import last_night
+
+STAYS_VERSION_KEY = 'stays_version'
+
+
+class Stay(NamedTuple):
+    """One booking as the calendar draws it: the room is held check_in_date..end_night inclusive."""
+    id: object
+    room_number: str
+    check_in_date: object
+    end_night: object
+    check_out_date: object
+    status: str
+    first_name: str
+    last_name: str
+
+
+class RoomIntervals:
+    """
+    Stays of one room sorted by check-in, with the running maximum of their
+    ends. A range test is a bisect plus one lookup; listing overlaps walks
+    back from there only while an overlap is still possible.
+
+    By default a stay holds check_in_date..end_night inclusive, as the
+    calendar draws it. With end='check_out_date' and half_open=True it holds
+    [check_in_date, check_out_date), the booking rule: back-to-back stays
+    and same-day short stays do not overlap.
+    """
+
+    def __init__(self, stays, end='end_night', half_open=False):
+        self.stays = sorted(stays, key=lambda stay: (stay.check_in_date, getattr(stay, end)))
+        self.starts = [stay.check_in_date for stay in self.stays]
+        self.ends = [getattr(stay, end) for stay in self.stays]
+        self.max_end = list(accumulate(self.ends, max))
+        self.half_open = half_open
+
+    def _candidates(self, end):
+        """Number of stays starting early enough to reach end."""
+        return bisect_left(self.starts, end) if self.half_open else bisect_right(self.starts, end)
+
+    def _ends_before(self, stay_end, start):
+        return stay_end <= start if self.half_open else stay_end < start
+
+    def is_free(self, start, end):
+        """No stay overlaps start..end (inclusive, or [start, end) if half_open)."""
+        k = self._candidates(end)
+        return k == 0 or self._ends_before(self.max_end[k - 1], start)
+
+    def overlapping(self, start, end):
+        k = self._candidates(end)
+        found = []
+        for i in range(k - 1, -1, -1):
+            if self._ends_before(self.max_end[i], start):
+                break
+            if not self._ends_before(self.ends[i], start):
+                found.append(self.stays[i])
+        found.reverse()
+        return found
+
+
+class StayIndex:
+    """
+    Interval index over every stay that is not checked out, per room.
+    overlapping/is_free/free_rooms/stays_between follow the calendar's
+    inclusive last night; conflicts/booked_rooms use the booking rule,
+    [check_in_date, check_out_date).
+    """
+
+    def __init__(self, stays):
+        by_room = defaultdict(list)
+        for stay in stays:
+            by_room[stay.room_number].append(stay)
+        self.rooms = {number: RoomIntervals(room_stays) for number, room_stays in by_room.items()}
+        self.bookings = {
+            number: RoomIntervals([stay for stay in room_stays if stay.check_out_date is not None],
+                                  end='check_out_date', half_open=True)
+            for number, room_stays in by_room.items()
+        }
+
+    @staticmethod
+    def _filter(stays, exclude, statuses):
+        return [stay for stay in stays if stay.id != exclude and (statuses is None or stay.status in statuses)]
+
+    def overlapping(self, room_number, start, end, exclude=None, statuses=None):
+        intervals = self.rooms.get(room_number)
+        if intervals is None:
+            return []
+        return self._filter(intervals.overlapping(start, end), exclude, statuses)
+
+    def is_free(self, room_number, start, end, exclude=None, statuses=None):
+        intervals = self.rooms.get(room_number)
+        if intervals is None:
+            return True
+        if exclude is None and statuses is None:
+            return intervals.is_free(start, end)
+        return not self.overlapping(room_number, start, end, exclude, statuses)
+
+    def free_rooms(self, room_numbers, start, end, exclude=None, statuses=None):
+        return [number for number in room_numbers if self.is_free(number, start, end, exclude, statuses)]
+
+    def conflicts(self, room_number, check_in, check_out, exclude=None, statuses=None):
+        """Stays whose [check_in_date, check_out_date) overlaps [check_in, check_out)."""
+        intervals = self.bookings.get(room_number)
+        if intervals is None:
+            return []
+        return self._filter(intervals.overlapping(check_in, check_out), exclude, statuses)
+
+    def booked_rooms(self, check_in, check_out, exclude=None, statuses=None):
+        """Rooms with a stay overlapping [check_in, check_out)."""
+        return {number for number in self.bookings if self.conflicts(number, check_in, check_out, exclude, statuses)}
+
+    def stays_between(self, start, end):
+        """{room_number: [Stay, ...]} for every stay touching start..end."""
+        found = {}
+        for number, intervals in self.rooms.items():
+            stays = intervals.overlapping(start, end)
+            if stays:
+                found[number] = stays
+        return found
+
+
+def load_stays():
+    # Served by the partial guest_active_stay_idx
+    rows = GuestRegistration.objects.exclude(status='CHECKED_OUT').exclude(room_number='').filter(
+        check_in_date__isnull=False,
+    ).values_list(
+        'id', 'room_number', 'check_in_date', 'check_out_date', 'nights', 'stay_duration',
+        'status', 'first_name', 'last_name',
+    )
+    return [
+        Stay(
+            id=guest_id, room_number=room_number, check_in_date=check_in,
+            end_night=last_night(check_in, check_out, nights, stay_duration),
+            check_out_date=check_out, status=status, first_name=first_name, last_name=last_name,
+        )
+        for guest_id, room_number, check_in, check_out, nights, stay_duration, status, first_name, last_name in rows
+    ]
+
+
+def stays_version():
+    return cache_version(STAYS_VERSION_KEY)
+
+
+def bump_stays_version():
+    bump_cache_version(STAYS_VERSION_KEY)
+
+
+_index = None
+_index_version = None
+_index_loaded_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_stay_index():
+    """
+    This process's StayIndex, rebuilt once after any GuestRegistration write
+    and, without a shared cache, every UNSHARED_RELOAD_SECONDS.
+    """
+    global _index, _index_version, _index_loaded_at
+    version = stays_version()
+    with _index_lock:
+        if _index is None or _index_version != version or local_copy_expired(_index_loaded_at):
+            _index = StayIndex(load_stays())
+            _index_version = version
+            _index_loaded_at = time.monotonic()
+        return _index
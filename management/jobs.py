@@ -0,0 +1,44 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import GuestRegistration
+
+
+def purge_expired_registrations(batch_size=None, max_age=None):
+    """
+    Deletes PENDING registrations older than `max_age` in batches of at most
+    `batch_size` rows, so no single DELETE holds the write lock for long.
+    Returns {'deleted', 'batches', 'seconds'}.
+    """
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    if max_age is None:
+        max_age = timedelta(minutes=settings.PENDING_REGISTRATION_TTL_MINUTES)
+    cutoff = timezone.now() - max_age
+
+    started = time.monotonic()
+    deleted = 0
+    batches = 0
+    while True:
+        ids = list(
+            GuestRegistration.objects.filter(status='PENDING', created_at__lt=cutoff)
+            .order_by('created_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+
+        with transaction.atomic():
+            # Re-check the status in case the guest was activated since the SELECT
+            _, per_model = GuestRegistration.objects.filter(id__in=ids, status='PENDING').delete()
+        # The total from delete() also counts cascaded rows (search terms)
+        deleted += per_model.get(GuestRegistration._meta.label, 0)
+        batches += 1
+
+        if len(ids) < batch_size:
+            break
+
+    return {'deleted': deleted, 'batches': batches, 'seconds': time.monotonic() - started}
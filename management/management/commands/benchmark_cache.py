@@ -0,0 +1,61 @@
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from kegama_residences.cache import TieredCache, build_backend
+
+BACKENDS = {
+    'locmem': lambda tmp, url: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'},
+    'file': lambda tmp, url: {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': os.path.join(tmp, 'file')},
+    'sqlite': lambda tmp, url: {'BACKEND': 'kegama_residences.cache.SQLiteCache', 'LOCATION': os.path.join(tmp, 'cache.sqlite3')},
+    'redis': lambda tmp, url: {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': url},
+}
+# A cached analytics/stats payload is about this size
+PAYLOAD = {'series': [{'date': '2026-01-01', 'revenue': 1500.0, 'guests': 3}] * 30}
+
+
+class Command(BaseCommand):
+    help = "Times cache hits, writes and incr() on each shared backend, alone and behind the in-process LRU"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ops', type=int, default=2000)
+        parser.add_argument('--backends', default='locmem,file,sqlite')
+        parser.add_argument('--redis-url', default='redis://127.0.0.1:6379/0',
+                            help="Include 'redis' in --backends to time any Redis-protocol server here")
+
+    def handle(self, *args, **options):
+        ops = options['ops']
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in options['backends'].split(','):
+                config = BACKENDS[name](tmp, options['redis_url'])
+                try:
+                    shared = build_backend(config)
+                    shared.set('benchmark:probe', 1)
+                except Exception as e:
+                    self.stdout.write(self.style.WARNING(f"{name}: skipped ({e})"))
+                    continue
+                tiered = TieredCache('', {'OPTIONS': {'SHARED': config}})
+
+                for label, cache in ((name, shared), (f"{name} + LRU", tiered)):
+                    cache.set('benchmark:hit', PAYLOAD, 300)
+                    cache.set('benchmark:counter', 0, 300)
+                    results = {
+                        'get hit': self._time(lambda: cache.get('benchmark:hit'), ops),
+                        'set': self._time(lambda: cache.set('benchmark:hit', PAYLOAD, 300), ops // 10),
+                        'incr': self._time(lambda: cache.incr('benchmark:counter'), ops // 10),
+                    }
+                    self.stdout.write(label.ljust(16) + '  '.join(
+                        f"{op}: {statistics.median(times) * 1e6:8.1f} us" for op, times in results.items()
+                    ))
+                shared.clear()
+
+    def _time(self, func, ops):
+        times = []
+        for _ in range(max(ops, 1)):
+            started = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - started)
+        return times
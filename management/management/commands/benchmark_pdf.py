@@ -0,0 +1,74 @@
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from management.models import AdminSettings, GuestRegistration
+from management.pdf import PdfEngine, stylesheet_path
+
+
+class Command(BaseCommand):
+    help = "Times guest registration PDF renders with a cold vs. a warm WeasyPrint engine"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=20)
+
+    def handle(self, *args, **options):
+        import weasyprint
+
+        renders = options['renders']
+        base_url = str(settings.BASE_DIR)
+        css_path = stylesheet_path('guest_registration.css')
+
+        guest = GuestRegistration.objects.order_by('-id').first() or GuestRegistration(
+            first_name="JUAN", last_name="DELA CRUZ", address="Manila", phone="09170000000",
+        )
+        html_string = render_to_string('pdf/guest_registration.html', {
+            'guest': guest,
+            'base_dir': settings.BASE_DIR,
+            'requests_list': [],
+            'room_total': 0,
+            'requests_total': 0,
+            'grand_total': 0,
+            'now': timezone.now(),
+            'policy_text': AdminSettings.load().policy_text,
+        })
+
+        # Before: styles inline in the document, fonts and images set up per render
+        inline_css = Path(css_path).read_text()
+        inline_html = html_string.replace('</head>', f'<style>{inline_css}</style></head>', 1)
+
+        def cold():
+            weasyprint.HTML(string=inline_html, base_url=base_url).write_pdf()
+
+        started = time.perf_counter()
+        engine = PdfEngine()
+        engine.stylesheet(css_path)
+        warm_up = time.perf_counter() - started
+
+        def warm():
+            engine.render(html_string, base_url, [css_path])
+
+        cold_times = self._time(cold, renders)
+        warm_times = self._time(warm, renders)
+
+        self.stdout.write(f"Engine warm-up (once per process): {warm_up * 1000:.1f} ms")
+        for label, times in (('cold', cold_times), ('warm', warm_times)):
+            self.stdout.write(
+                f"{label}: median {statistics.median(times) * 1000:.1f} ms, "
+                f"min {min(times) * 1000:.1f} ms over {renders} renders"
+            )
+        speedup = statistics.median(cold_times) / statistics.median(warm_times)
+        self.stdout.write(self.style.SUCCESS(f"Warm engine is {speedup:.2f}x faster per render"))
+
+    def _time(self, func, renders):
+        times = []
+        for _ in range(renders):
+            started = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - started)
+        return times
@@ -0,0 +1,78 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+
+from management.intervals import Stay
+from management.models import Room
+from management.timeline import build_timeline, days_between
+
+# The calendar grid before and after, stripped to the loops that drive it
+BOOKING_MAP_GRID = Template("""
+{% for room in rooms %}<tr>{% for day in days_range %}<td>
+{% for r_num, guests in booking_map.items %}{% if r_num == room.number %}{% for g in guests %}
+{% if g.check_in_date <= day and day <= g.end_night %}<i class="{% if g.check_in_date == day %}s{% endif %}{% if g.end_night == day %}e{% endif %}">{{ g.last_name }}</i>{% endif %}
+{% endfor %}{% endif %}{% endfor %}
+</td>{% endfor %}</tr>{% endfor %}
+""")
+TIMELINE_GRID = Template("""
+{% for row in timeline %}<tr>{% for cell in row.cells %}<td>
+{% for bar in cell.bars %}<i class="{% if bar.starts %}s{% endif %}{% if bar.ends %}e{% endif %}">{{ bar.stay.last_name }}</i>{% endfor %}
+</td>{% endfor %}</tr>{% endfor %}
+""")
+
+
+class Command(BaseCommand):
+    help = "Times the month calendar grid rendered from booking_map vs. from build_timeline rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=120)
+        parser.add_argument('--days', type=int, default=31)
+        parser.add_argument('--renders', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        start = date(2026, 1, 1)
+        end = start + timedelta(days=options['days'] - 1)
+        rooms = [Room(number=f"{n // 20 + 1}{n % 20:02d}", floor=f"Floor {n // 20 + 1}") for n in range(options['rooms'])]
+
+        # Back-to-back stays of 1-4 nights filling most of each room's month
+        stays, stay_id = {}, 0
+        for room in rooms:
+            day = start - timedelta(days=rng.randint(0, 3))
+            while day <= end:
+                nights = rng.randint(1, 4)
+                stay_id += 1
+                stays.setdefault(room.number, []).append(Stay(
+                    stay_id, room.number, day, day + timedelta(days=nights - 1), day + timedelta(days=nights),
+                    'PRINTED', 'GUEST', f"L{stay_id}",
+                ))
+                day += timedelta(days=nights + rng.randint(0, 2))
+        days_range = days_between(start, end)
+
+        def before():
+            return BOOKING_MAP_GRID.render(Context({'rooms': rooms, 'days_range': days_range, 'booking_map': stays}))
+
+        def after():
+            return TIMELINE_GRID.render(Context({'timeline': build_timeline(start, end, rooms, stays)}))
+
+        build_times = self._time(lambda: build_timeline(start, end, rooms, stays), options['renders'])
+        results = [('booking_map', self._time(before, options['renders'])), ('timeline', self._time(after, options['renders']))]
+
+        self.stdout.write(f"{len(rooms)} rooms x {len(days_range)} days, {stay_id} stays")
+        self.stdout.write(f"build_timeline alone: median {statistics.median(build_times) * 1000:.1f} ms")
+        for label, times in results:
+            self.stdout.write(f"{label}: median {statistics.median(times) * 1000:.1f} ms, min {min(times) * 1000:.1f} ms")
+        speedup = statistics.median(results[0][1]) / statistics.median(results[1][1])
+        self.stdout.write(self.style.SUCCESS(f"Timeline rows render {speedup:.1f}x faster"))
+
+    def _time(self, func, renders):
+        times = []
+        for _ in range(renders):
+            started = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - started)
+        return times
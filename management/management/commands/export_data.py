@@ -0,0 +1,40 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from management import exports
+
+
+class Command(BaseCommand):
+    help = "Streams guest registrations or the audit log to CSV or JSON Lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(exports.DATASETS))
+        parser.add_argument('--format', choices=list(exports.FORMATS), default='csv')
+        parser.add_argument('--start', type=date.fromisoformat, help="First day (YYYY-MM-DD), inclusive")
+        parser.add_argument('--end', type=date.fromisoformat, help="Last day (YYYY-MM-DD), inclusive")
+        parser.add_argument('--status', help="Guest status, or audit log action")
+        parser.add_argument('--output', '-o', help="File to write; defaults to stdout")
+
+    def handle(self, *args, **options):
+        try:
+            columns, rows = exports.export_rows(
+                options['dataset'], start=options['start'], end=options['end'], value=options['status'],
+            )
+            lines = exports.render_lines(options['format'], columns, rows)
+        except exports.ExportError as e:
+            raise CommandError(e)
+
+        if not options['output']:
+            for chunk in exports.chunked(lines):
+                self.stdout.write(chunk, ending='')
+            return
+
+        started = time.monotonic()
+        with open(options['output'], 'w', newline='', encoding='utf-8') as f:
+            for chunk in exports.chunked(lines):
+                f.write(chunk)
+        self.stderr.write(self.style.SUCCESS(
+            f"Wrote {options['dataset']} to {options['output']} ({time.monotonic() - started:.3f}s)"
+        ))
@@ -0,0 +1,42 @@
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from management import guest_pdf
+from management.models import AdminSettings, GuestRegistration
+from management.pdf import get_engine, stylesheet_path
+
+
+class Command(BaseCommand):
+    help = "Renders every matching guest registration form into one merged PDF"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Path of the PDF to write")
+        parser.add_argument('--date', type=date.fromisoformat,
+                            help="Check-in date (YYYY-MM-DD); defaults to today unless --status is given")
+        parser.add_argument('--status', choices=[value for value, _ in GuestRegistration.STATUS_CHOICES])
+
+    def handle(self, *args, **options):
+        day, status = options['date'], options['status']
+        if day is None and not status:
+            day = timezone.localdate()
+
+        guests = list(guest_pdf.batch_guests(day=day, status=status))
+        if not guests:
+            raise CommandError("No registrations match this batch")
+
+        started = time.monotonic()
+        html_string = guest_pdf.render_batch_html(guests, AdminSettings.load().policy_text)
+        pdf_bytes = get_engine().render(
+            html_string, str(settings.BASE_DIR), [stylesheet_path(guest_pdf.STYLESHEET)],
+        )
+        with open(options['output'], 'wb') as f:
+            f.write(pdf_bytes)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(guests)} registration forms to {options['output']} "
+            f"({time.monotonic() - started:.3f}s)"
+        ))
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from management.jobs import purge_expired_registrations
+
+
+class Command(BaseCommand):
+    help = "Deletes expired PENDING guest registrations in bounded batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.PURGE_BATCH_SIZE)
+        parser.add_argument('--minutes', type=int, default=settings.PENDING_REGISTRATION_TTL_MINUTES,
+                            help="Age after which a PENDING registration expires")
+
+    def handle(self, *args, **options):
+        result = purge_expired_registrations(
+            batch_size=options['batch_size'],
+            max_age=timedelta(minutes=options['minutes']),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {result['deleted']} expired registrations in {result['batches']} batches "
+            f"({result['seconds']:.3f}s)"
+        ))
@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from management.rollup import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the DailyRevenue rollup from GuestRegistration"
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        buckets = rebuild_rollup()
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {buckets} daily revenue buckets ({time.monotonic() - started:.3f}s)"
+        ))
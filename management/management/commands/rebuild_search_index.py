@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from management.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the guest search index from GuestRegistration"
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        indexed = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} guests ({time.monotonic() - started:.3f}s)"
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from management.rack import reconcile_room_statuses
+
+
+class Command(BaseCommand):
+    help = "Flips rooms between AVAILABLE and OCCUPIED to match their guests' stay dates"
+
+    def handle(self, *args, **options):
+        result = reconcile_room_statuses()
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {result['changed']} rooms ({result['seconds']:.3f}s)"
+        ))
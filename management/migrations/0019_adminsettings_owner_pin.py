@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0018_alter_guestregistration_mode_of_payment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adminsettings',
+            name='owner_pin',
+            field=models.CharField(default='99999', help_text='PIN for Owner/Payroll Access', max_length=10),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0019_adminsettings_owner_pin'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='guestregistration',
+            index=models.Index(fields=['created_at', 'id'], name='guest_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guestregistration',
+            index=models.Index(fields=['status', 'created_at'], name='guest_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guestregistration',
+            index=models.Index(fields=['status', 'check_out_date'], name='guest_status_checkout_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guestregistration',
+            index=models.Index(fields=['check_out_date', 'check_in_date'], name='guest_stay_dates_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guestregistration',
+            index=models.Index(fields=['room_number', 'check_in_date'], name='guest_room_checkin_idx'),
+        ),
+    ]
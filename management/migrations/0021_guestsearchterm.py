@@ -0,0 +1,26 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0020_guestregistration_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GuestSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('W', 'Word'), ('G', 'Trigram')], max_length=1)),
+                ('term', models.CharField(max_length=100)),
+                ('guest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='management.guestregistration')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'term', 'guest'], name='search_term_idx')],
+            },
+        ),
+    ]
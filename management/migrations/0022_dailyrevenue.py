@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0021_guestsearchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('source', models.CharField(max_length=10)),
+                ('mode_of_payment', models.CharField(max_length=20)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('guests', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'source', 'mode_of_payment'), name='daily_revenue_bucket_uniq')],
+            },
+        ),
+    ]
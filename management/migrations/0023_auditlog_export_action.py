@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0022_dailyrevenue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action',
+            field=models.CharField(choices=[('LOGIN', 'Admin Login'), ('VIEW_GUEST', 'Viewed Guest'), ('UPDATE_GUEST', 'Updated Guest'), ('PRINT_PDF', 'Generated PDF'), ('EXPORT_DATA', 'Exported Data')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0023_auditlog_export_action'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='guestregistration',
+            index=models.Index(condition=models.Q(('status', 'CHECKED_OUT'), _negated=True), fields=['room_number', 'check_in_date'], name='guest_active_stay_idx'),
+        ),
+    ]
@@ -1,13 +1,19 @@
+import copy
+import threading
+import time
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 
+from .conditional import bump_cache_version, cache_is_shared, cache_version
+
 class AuditLog(models.Model):
     ACTION_CHOICES = [
         ('LOGIN', 'Admin Login'),
         ('VIEW_GUEST', 'Viewed Guest'),
         ('UPDATE_GUEST', 'Updated Guest'),
         ('PRINT_PDF', 'Generated PDF'),
+        ('EXPORT_DATA', 'Exported Data'),
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -79,6 +85,25 @@ class GuestRegistration(models.Model):
 
     notes = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            # Dashboard keyset pages, month sections and analytics date ranges
+            models.Index(fields=['created_at', 'id'], name='guest_created_idx'),
+            # Room rack (status IN ... ORDER BY created_at) and the pending purge
+            models.Index(fields=['status', 'created_at'], name='guest_status_created_idx'),
+            # Rooms occupied today in update_guest
+            models.Index(fields=['status', 'check_out_date'], name='guest_status_checkout_idx'),
+            # Calendar / timeline stays overlapping a month
+            models.Index(fields=['check_out_date', 'check_in_date'], name='guest_stay_dates_idx'),
+            # Booking conflict detection for a single room
+            models.Index(fields=['room_number', 'check_in_date'], name='guest_room_checkin_idx'),
+            # Loading the in-process StayIndex (intervals.py)
+            models.Index(
+                fields=['room_number', 'check_in_date'], condition=~models.Q(status='CHECKED_OUT'),
+                name='guest_active_stay_idx',
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.booking_id:
             import uuid
@@ -88,6 +113,43 @@ class GuestRegistration(models.Model):
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.room_number}"
 
+class GuestSearchTerm(models.Model):
+    """Normalized words and trigrams of a guest's searchable fields (see management/search.py)."""
+    WORD = 'W'
+    TRIGRAM = 'G'
+    KIND_CHOICES = [
+        (WORD, 'Word'),
+        (TRIGRAM, 'Trigram'),
+    ]
+
+    guest = models.ForeignKey(GuestRegistration, on_delete=models.CASCADE, related_name='search_terms')
+    kind = models.CharField(max_length=1, choices=KIND_CHOICES)
+    term = models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'term', 'guest'], name='search_term_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.term}"
+
+class DailyRevenue(models.Model):
+    """Revenue and guest count per business day, source and payment mode (see management/rollup.py)."""
+    date = models.DateField()
+    source = models.CharField(max_length=10)
+    mode_of_payment = models.CharField(max_length=20)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    guests = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'source', 'mode_of_payment'], name='daily_revenue_bucket_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.source}/{self.mode_of_payment}: {self.revenue}"
+
 class AdminSettings(models.Model):
     pin_code = models.CharField(max_length=10, default='12345', help_text="PIN for Management Access")
     owner_pin = models.CharField(max_length=10, default='99999', help_text="PIN for Owner/Payroll Access")
@@ -108,14 +170,42 @@ Check-out Time: 12:00 NN
         verbose_name = "Admin Settings"
         verbose_name_plural = "Admin Settings"
 
+    # Other workers pick up a save within this many seconds: the version is
+    # read from the shared backend itself, past TieredCache's local tier
+    RECHECK_SECONDS = 1.0
+    VERSION_KEY = 'admin_settings_version'
+    _cached = None  # (instance, version, checked_at), per process
+    _cache_lock = threading.Lock()
+
     def save(self, *args, **kwargs):
         self.pk = 1
         super(AdminSettings, self).save(*args, **kwargs)
+        AdminSettings._cached = None
+        transaction.on_commit(lambda: bump_cache_version(AdminSettings.VERSION_KEY))
 
     @classmethod
     def load(cls):
-        obj, created = cls.objects.get_or_create(pk=1)
-        return obj
+        """
+        A copy of the settings row from a per-process cache. The shared version
+        key is checked at most once per RECHECK_SECONDS, and the row is only
+        re-read when save() (in any worker) has moved it, so a save is seen
+        everywhere within RECHECK_SECONDS. Without a shared
+        cache the version cannot be trusted, so the row is re-read on every
+        check instead.
+        """
+        now = time.monotonic()
+        with cls._cache_lock:
+            cached = cls._cached
+            if cached and now - cached[2] < cls.RECHECK_SECONDS:
+                return copy.copy(cached[0])
+
+            version = cache_version(cls.VERSION_KEY, fresh=True)
+            if cached and cached[1] == version and cache_is_shared():
+                obj = cached[0]
+            else:
+                obj, created = cls.objects.get_or_create(pk=1)
+            cls._cached = (obj, version, now)
+            return copy.copy(obj)
 
     def __str__(self):
         return f"System Settings (PIN: {self.pin_code})"
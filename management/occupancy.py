@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Q
+
+from .models import GuestRegistration, Room
+
+# Registrations that actually held a room (PENDING forms were never confirmed)
+OCCUPYING_STATUSES = ('PRINTED', 'CHECKED_IN', 'CHECKED_OUT')
+PERIODS = ('day', 'week', 'month', 'year')
+
+
+def last_night(check_in, check_out, nights, stay_duration):
+    """
+    Last day a stay keeps its room, inclusive, using the same rule as the
+    calendar: 22-hour stays hold the room on check-out day, same-day stays
+    hold only check-in day, everything else frees the room on check-out day.
+    """
+    if check_out is None:
+        return check_in + timedelta(days=max(nights or 1, 1) - 1)
+    if '22' in str(stay_duration):
+        return check_out
+    if check_in == check_out:
+        return check_in
+    return check_out - timedelta(days=1)
+
+
+class OccupancyMatrix:
+    """
+    Room x day occupancy and room revenue for the inclusive range start..end,
+    built from every confirmed stay in one vectorized pass. Room revenue
+    (room_rate x nights) is spread evenly over the nights a stay occupies.
+    """
+
+    def __init__(self, start, end, rooms=None, stays=None):
+        self.start = start
+        self.end = end
+        self.days = np.arange(np.datetime64(start), np.datetime64(end) + 1)
+        self.rooms = list(rooms) if rooms is not None else list(
+            Room.objects.order_by('number').values_list('number', flat=True)
+        )
+        if stays is None:
+            stays = GuestRegistration.objects.filter(
+                Q(check_out_date__gte=start) | Q(check_out_date__isnull=True),
+                status__in=OCCUPYING_STATUSES,
+                check_in_date__lte=end,
+                room_number__in=self.rooms,
+            ).values_list('room_number', 'check_in_date', 'check_out_date', 'nights', 'stay_duration', 'room_rate')
+        self.occupied, self.revenue = self._build(list(stays))
+
+    def _build(self, stays):
+        shape = (len(self.rooms), len(self.days))
+        room_index = {number: i for i, number in enumerate(self.rooms)}
+        stays = [stay for stay in stays if stay[0] in room_index and stay[1] is not None]
+        if not stays or not self.rooms:
+            return np.zeros(shape, dtype=bool), np.zeros(shape)
+
+        rooms = np.array([room_index[stay[0]] for stay in stays])
+        first = np.array([stay[1] for stay in stays], dtype='datetime64[D]')
+        last = np.array([last_night(*stay[1:5]) for stay in stays], dtype='datetime64[D]')
+        nights = np.maximum(np.array([stay[3] or 1 for stay in stays]), 1)
+        rate = np.array([float(stay[5] or 0) for stay in stays])
+        per_day = rate * nights / ((last - first).astype(int) + 1)
+
+        # Clip to the window and drop stays that end before it starts
+        lo = np.maximum((first - self.days[0]).astype(int), 0)
+        hi = np.minimum((last - self.days[0]).astype(int), shape[1] - 1)
+        keep = lo <= hi
+        rooms, lo, hi, per_day = rooms[keep], lo[keep], hi[keep], per_day[keep]
+
+        # Difference arrays: +1 on a stay's first day, -1 after its last
+        count = np.zeros((shape[0], shape[1] + 1))
+        money = np.zeros((shape[0], shape[1] + 1))
+        np.add.at(count, (rooms, lo), 1)
+        np.add.at(count, (rooms, hi + 1), -1)
+        np.add.at(money, (rooms, lo), per_day)
+        np.add.at(money, (rooms, hi + 1), -per_day)
+        return np.cumsum(count, axis=1)[:, :-1] > 0, np.cumsum(money, axis=1)[:, :-1]
+
+    @staticmethod
+    def _kpis(sold, available, revenue):
+        return {
+            'room_nights': int(sold),
+            'available_room_nights': int(available),
+            'revenue': float(revenue),
+            'occupancy': float(sold / available * 100) if available else 0.0,
+            'adr': float(revenue / sold) if sold else 0.0,
+            'revpar': float(revenue / available) if available else 0.0,
+        }
+
+    def summary(self):
+        """Occupancy %, ADR and RevPAR over the whole range."""
+        return self._kpis(self.occupied.sum(), self.occupied.size, self.revenue.sum())
+
+    def by_period(self, period='day'):
+        """The same KPIs per day, week (from Monday), month or year, oldest first."""
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period {period!r}")
+        if period == 'week':
+            weekday = (self.days.view('int64') + 3) % 7  # 1970-01-01 was a Thursday
+            keys = self.days - weekday.astype('timedelta64[D]')
+        else:
+            unit = {'day': 'D', 'month': 'M', 'year': 'Y'}[period]
+            keys = self.days.astype(f'datetime64[{unit}]').astype('datetime64[D]')
+
+        starts, group = np.unique(keys, return_inverse=True)
+        sold = np.bincount(group, weights=self.occupied.sum(axis=0), minlength=len(starts))
+        revenue = np.bincount(group, weights=self.revenue.sum(axis=0), minlength=len(starts))
+        available = np.bincount(group, minlength=len(starts)) * len(self.rooms)
+        return [
+            {'date': starts[i].item(), **self._kpis(sold[i], available[i], revenue[i])}
+            for i in range(len(starts))
+        ]
@@ -0,0 +1,85 @@
+import uuid
+from datetime import datetime
+
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+GUEST_PAGE_SIZE = 25
+CURSOR_SEPARATOR = '|'
+
+
+def month_sections(queryset):
+    """Month buckets (newest first) with their row counts, grouped in SQL."""
+    rows = (
+        queryset.order_by()
+        .annotate(month=TruncMonth('created_at'))
+        .values('month')
+        .annotate(count=Count('id'))
+        .order_by('-month')
+    )
+    return [
+        {'month': row['month'], 'key': row['month'].strftime('%Y-%m'), 'count': row['count']}
+        for row in rows
+    ]
+
+
+def parse_month(key):
+    """
+    'YYYY-MM' -> aware start of that month in the current timezone, or None.
+    Also None for a month whose end bound datetime cannot hold (9999-12).
+    """
+    try:
+        start = timezone.make_aware(datetime.strptime(key or '', '%Y-%m'))
+        month_bounds(start)
+    except ValueError:
+        return None
+    return start
+
+
+def month_bounds(month_start):
+    if month_start.month == 12:
+        month_end = month_start.replace(year=month_start.year + 1, month=1)
+    else:
+        month_end = month_start.replace(month=month_start.month + 1)
+    return month_start, month_end
+
+
+def encode_cursor(guest):
+    return f"{guest.created_at.isoformat()}{CURSOR_SEPARATOR}{guest.id}"
+
+
+def decode_cursor(raw):
+    """Returns (created_at, id) or None for a missing or malformed cursor."""
+    if not raw or CURSOR_SEPARATOR not in raw:
+        return None
+    created_raw, id_raw = raw.split(CURSOR_SEPARATOR, 1)
+    try:
+        created_at = parse_datetime(created_raw)
+        guest_id = uuid.UUID(id_raw)
+    except ValueError:
+        return None
+    if created_at is None:
+        return None
+    return created_at, guest_id
+
+
+def keyset_page(queryset, cursor=None, size=GUEST_PAGE_SIZE):
+    """
+    One page ordered by (-created_at, -id), starting strictly after `cursor`.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    if cursor:
+        created_at, guest_id = cursor
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=guest_id)
+        )
+
+    rows = list(queryset[:size + 1])
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        next_cursor = encode_cursor(rows[-1])
+    return rows, next_cursor
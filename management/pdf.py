@@ -0,0 +1,199 @@
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+
+
+class PdfRendererBusy(Exception):
+    """The render queue is full (or a job timed out); the client should retry later."""
+
+
+STYLESHEET_DIR = Path('static') / 'css' / 'pdf'
+PDF_STYLESHEETS = (
+    'guest_registration.css',
+    'analytics_report.css',
+    'timeline_report.css',
+)
+
+
+def stylesheet_path(name):
+    return str(Path(settings.BASE_DIR) / STYLESHEET_DIR / name)
+
+
+class PdfEngine:
+    """
+    Long-lived WeasyPrint state for one process: a single FontConfiguration,
+    stylesheets parsed once per path and a shared cache of decoded images
+    (the logo), so a render only pays for the HTML and its layout.
+    """
+
+    def __init__(self):
+        # weasyprint is only imported where PDFs are actually rendered
+        from weasyprint.text.fonts import FontConfiguration
+        self.font_config = FontConfiguration()
+        self.image_cache = {}
+        self._stylesheets = {}
+        # Only contended with workers=0, where request threads share the engine
+        self._lock = threading.Lock()
+
+    def stylesheet(self, path):
+        sheet = self._stylesheets.get(path)
+        if sheet is None:
+            import weasyprint
+            sheet = weasyprint.CSS(filename=path, font_config=self.font_config)
+            self._stylesheets[path] = sheet
+        return sheet
+
+    def render(self, html_string, base_url, stylesheets=()):
+        import weasyprint
+        with self._lock:
+            return weasyprint.HTML(string=html_string, base_url=base_url).write_pdf(
+                stylesheets=[self.stylesheet(path) for path in stylesheets],
+                font_config=self.font_config,
+                cache=self.image_cache,
+            )
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = PdfEngine()
+        return _engine
+
+
+def _warm_up(stylesheets):
+    # Pool initializer: pay for fonts and CSS before the first job arrives
+    engine = get_engine()
+    for path in stylesheets:
+        engine.stylesheet(path)
+
+
+def _render_html(html_string, base_url, stylesheets=()):
+    return get_engine().render(html_string, base_url, stylesheets)
+
+
+class RenderSlots:
+    """
+    At most `limit` renders at once across every web worker: each render
+    claims one of `limit` keys in the shared cache with add(). Keys expire
+    after `ttl` seconds, so a worker that dies mid-render cannot hold a slot
+    forever. With a per-process cache (CACHE_BACKEND=locmem) the bound only
+    holds per worker.
+    """
+    KEY = 'pdf-render-slot'
+
+    def __init__(self, limit, ttl, cache=None):
+        self.limit = max(limit, 1)
+        self.ttl = ttl
+        self.cache = cache or default_cache
+
+    def acquire(self):
+        """The claimed slot's (key, token), or None when every slot is taken."""
+        token = uuid.uuid4().hex
+        for i in range(self.limit):
+            key = f'{self.KEY}:{i}'
+            if self.cache.add(key, token, self.ttl):
+                return key, token
+        return None
+
+    def release(self, slot):
+        key, token = slot
+        # Not if the slot expired and another render has claimed it since
+        if self.cache.get(key) == token:
+            self.cache.delete(key)
+
+
+class PdfRenderPool:
+    """
+    Renders PDFs in a small pool of worker processes so WeasyPrint layout
+    never runs on the request thread. At most `queue_size` jobs (running or
+    waiting) are accepted across all web workers (RenderSlots); beyond that
+    render() fails fast with PdfRendererBusy, before tying up a worker.
+    With `workers=0` everything renders in-process (tests, single-process setups).
+    """
+
+    def __init__(self, workers, queue_size, timeout, stylesheets=(), cache=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.stylesheets = tuple(stylesheets)
+        # A job that timed out keeps its slot until the renderer finishes it
+        self.slots = RenderSlots(queue_size, ttl=timeout * 2, cache=cache)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_warm_up,
+                    initargs=(self.stylesheets,),
+                )
+            return self._executor
+
+    def _reset(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def render(self, html_string, base_url, stylesheets=()):
+        slot = self.slots.acquire()
+        if slot is None:
+            raise PdfRendererBusy("PDF render queue is full")
+
+        if not self.workers:
+            try:
+                return _render_html(html_string, base_url, stylesheets)
+            finally:
+                self.slots.release(slot)
+
+        try:
+            future = self._get_executor().submit(_render_html, html_string, base_url, stylesheets)
+        except BrokenProcessPool:
+            self.slots.release(slot)
+            self._reset()
+            raise PdfRendererBusy("PDF render pool restarted")
+        future.add_done_callback(lambda _: self.slots.release(slot))
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PdfRendererBusy("PDF render timed out")
+        except BrokenProcessPool:
+            self._reset()
+            raise PdfRendererBusy("PDF render pool restarted")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PdfRenderPool(
+                workers=settings.PDF_RENDER_WORKERS,
+                queue_size=settings.PDF_RENDER_QUEUE_SIZE,
+                timeout=settings.PDF_RENDER_TIMEOUT,
+                stylesheets=[stylesheet_path(name) for name in PDF_STYLESHEETS],
+            )
+        return _pool
+
+
+def render_pdf(html_string, stylesheet=None):
+    """Renders `html_string` with one of the PDF_STYLESHEETS (by file name)."""
+    stylesheets = [stylesheet_path(stylesheet)] if stylesheet else []
+    return get_pool().render(html_string, str(settings.BASE_DIR), stylesheets)
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import get_template
+
+from .pdf import stylesheet_path
+
+# Fields that change on every save without changing the printed form
+VOLATILE_FIELDS = {'updated_at'}
+
+
+def cache_dir():
+    path = Path(settings.PDF_CACHE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@lru_cache(maxsize=None)
+def template_version(template_name):
+    source = get_template(template_name).template.source
+    return hashlib.sha256(source.encode()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def stylesheet_version(name):
+    return hashlib.sha256(Path(stylesheet_path(name)).read_bytes()).hexdigest()[:16]
+
+
+def guest_pdf_key(guest, policy_text, template_names, stylesheet, print_date):
+    """Content hash of everything that ends up on a guest registration PDF."""
+    fields = {
+        f.attname: str(getattr(guest, f.attname))
+        for f in guest._meta.concrete_fields
+        if f.attname not in VOLATILE_FIELDS
+    }
+    payload = json.dumps({
+        'guest': fields,
+        'policy_text': policy_text,
+        'templates': [template_version(name) for name in template_names],
+        'stylesheet': stylesheet_version(stylesheet),
+        'date': str(print_date),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _path(key):
+    return cache_dir() / f"{key}.pdf"
+
+
+def get(key):
+    path = _path(key)
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    # mtime doubles as the LRU clock
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+    return data
+
+
+def open_file(key):
+    """The cached PDF as an open binary file (for streaming), or None."""
+    try:
+        f = _path(key).open('rb')
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(f.name)
+    except FileNotFoundError:
+        pass
+    return f
+
+
+def put(key, data):
+    directory = cache_dir()
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, _path(key))
+    evict()
+
+
+def evict(max_bytes=None):
+    """Deletes least recently used PDFs until the cache fits in max_bytes."""
+    if max_bytes is None:
+        max_bytes = settings.PDF_CACHE_MAX_BYTES
+
+    entries = []
+    total = 0
+    for path in cache_dir().glob('*.pdf'):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
@@ -0,0 +1,63 @@
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from .catalog import bump_catalog_version
+from .conditional import bump_change_version
+from .events import publish
+from .models import GuestRegistration, Room
+from .stats import invalidate_stats
+
+RACK_STATUSES = ('PENDING', 'PRINTED')
+
+
+def guests_by_room():
+    """The most recently created PENDING/PRINTED guest for each room number."""
+    active_guests = GuestRegistration.objects.filter(
+        status__in=RACK_STATUSES
+    ).order_by('created_at')
+    return {guest.room_number: guest for guest in active_guests if guest.room_number}
+
+
+def reconciled_status(room, guest, today):
+    """The status `room` should have given its rack guest, or None to leave it alone."""
+    if guest is None or guest.status != 'PRINTED':
+        return None
+    if not (guest.check_in_date and guest.check_out_date):
+        return None
+    in_stay = guest.check_in_date <= today < guest.check_out_date
+    if in_stay and room.status == 'AVAILABLE':
+        return 'OCCUPIED'
+    if not in_stay and room.status == 'OCCUPIED':
+        return 'AVAILABLE'
+    return None
+
+
+def reconcile_room_statuses():
+    """
+    Flips rooms between AVAILABLE and OCCUPIED to match the stay dates of
+    their rack guest: one pass over all rooms, one bulk_update. Runs after
+    guest and room writes and from the scheduler (the date rolls over on
+    its own). Returns {'changed', 'seconds'}.
+    """
+    started = time.monotonic()
+    today = timezone.localdate()
+
+    with transaction.atomic():
+        room_map = guests_by_room()
+        changed = []
+        for room in Room.objects.select_for_update().filter(number__in=room_map):
+            status = reconciled_status(room, room_map[room.number], today)
+            if status:
+                room.status = status
+                changed.append(room)
+        Room.objects.bulk_update(changed, ['status'])
+
+    if changed:
+        # bulk_update skips post_save
+        invalidate_stats()
+        bump_change_version()
+        bump_catalog_version()
+        publish('rooms')
+    return {'changed': len(changed), 'seconds': time.monotonic() - started}
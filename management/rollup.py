@@ -0,0 +1,77 @@
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyRevenue, GuestRegistration
+
+# Guest fields that decide which DailyRevenue bucket a guest lands in and what it adds
+ROLLUP_FIELDS = ('created_at', 'source', 'mode_of_payment', 'total_amount')
+REBUILD_BATCH_SIZE = 500
+
+
+def bucket_of(created_at, source, mode_of_payment):
+    return (timezone.localdate(created_at), source, mode_of_payment)
+
+
+def refresh_bucket(day, source, mode_of_payment):
+    """Re-sums one business day/source/payment bucket from GuestRegistration."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    totals = GuestRegistration.objects.filter(
+        created_at__gte=start,
+        created_at__lt=start + timedelta(days=1),
+        source=source,
+        mode_of_payment=mode_of_payment,
+    ).aggregate(guests=Count('id'), revenue=Sum('total_amount'))
+
+    bucket = DailyRevenue.objects.filter(date=day, source=source, mode_of_payment=mode_of_payment)
+    if not totals['guests']:
+        bucket.delete()
+        return
+    DailyRevenue.objects.update_or_create(
+        date=day, source=source, mode_of_payment=mode_of_payment,
+        defaults={'guests': totals['guests'], 'revenue': totals['revenue'] or 0},
+    )
+
+
+def rebuild_rollup(batch_size=REBUILD_BATCH_SIZE):
+    """Recomputes every DailyRevenue row; returns the number of buckets written."""
+    totals = GuestRegistration.objects.annotate(
+        day=TruncDate('created_at'),
+    ).values('day', 'source', 'mode_of_payment').annotate(
+        guests=Count('id'),
+        revenue=Sum('total_amount'),
+    ).order_by()
+
+    rows = [
+        DailyRevenue(
+            date=row['day'], source=row['source'], mode_of_payment=row['mode_of_payment'],
+            guests=row['guests'], revenue=row['revenue'] or 0,
+        )
+        for row in totals
+    ]
+    with transaction.atomic():
+        DailyRevenue.objects.all().delete()
+        DailyRevenue.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def revenue_series(start, trunc, end=None):
+    """Revenue and guests per `trunc` period (TruncDay, TruncWeek, ...) from `start` through `end`."""
+    rows = DailyRevenue.objects.filter(date__gte=start)
+    if end is not None:
+        rows = rows.filter(date__lte=end)
+    rows = (
+        rows
+        .annotate(period=trunc('date'))
+        .values('period')
+        .annotate(revenue=Sum('revenue'), guests=Sum('guests'))
+        .order_by('period')
+    )
+    return [{'date': row['period'], 'revenue': row['revenue'], 'guests': row['guests']} for row in rows]
+
+
+def source_counts():
+    return list(DailyRevenue.objects.values('source').annotate(count=Sum('guests')).order_by())
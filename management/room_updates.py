@@ -0,0 +1,107 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .catalog import bump_catalog_version
+from .conditional import bump_change_version
+from .events import publish
+from .models import Room
+from .stats import invalidate_stats
+
+PRICE_FIELDS = ('price', 'price_6hr', 'price_10hr')
+EDITABLE_FIELDS = PRICE_FIELDS + ('capacity', 'status')
+ROOM_STATUSES = dict(Room._meta.get_field('status').choices)
+
+
+class RoomUpdateError(ValueError):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(errors))
+
+
+def _clean(field, value):
+    """Runs the model field's own checks (digits, range, NaN/Infinity) on value."""
+    try:
+        return Room._meta.get_field(field).clean(value, None)
+    except ValidationError as e:
+        raise ValueError(f"{field}: {' '.join(e.messages)}")
+
+
+def _price(raw, field='price'):
+    raw = (raw or '0').replace(',', '').strip() or '0'
+    try:
+        value = Decimal(raw)
+    except InvalidOperation:
+        raise ValueError(f"{raw!r} is not a price")
+    if not value.is_finite():
+        raise ValueError(f"{raw!r} is not a price")
+    if value < 0 or value != value.to_integral_value():
+        raise ValueError(f"{raw!r} is not a whole, non-negative price")
+    return _clean(field, value)
+
+
+def _capacity(raw):
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f"{raw!r} is not a capacity")
+    if value < 1:
+        raise ValueError("capacity must be at least 1")
+    return _clean('capacity', value)
+
+
+def parse_room_rows(data, room_numbers):
+    """
+    {room_number: {field: value}} for every room with a row in the bulk edit
+    form (price_<n>, price_6hr_<n>, price_10hr_<n>, capacity_<n>, status_<n>).
+    Checks every row first and raises RoomUpdateError listing all bad ones.
+    """
+    rows, errors = {}, []
+    for number in room_numbers:
+        if f'price_{number}' not in data:
+            continue
+        try:
+            row = {field: _price(data.get(f'{field}_{number}'), field) for field in PRICE_FIELDS}
+            row['capacity'] = _capacity(data.get(f'capacity_{number}', 1))
+            status = data.get(f'status_{number}')
+            if status is not None:
+                if status not in ROOM_STATUSES:
+                    raise ValueError(f"unknown status {status!r}")
+                row['status'] = status
+        except ValueError as e:
+            errors.append(f"Room {number}: {e}")
+            continue
+        rows[number] = row
+    if errors:
+        raise RoomUpdateError(errors)
+    return rows
+
+
+def apply_room_updates(rows):
+    """
+    Writes the rows from parse_room_rows in one transaction: only rooms whose
+    values differ, in a single bulk_update. Returns (rooms changed, fields changed).
+    """
+    with transaction.atomic():
+        changed_rooms, changed_fields = [], set()
+        field_count = 0
+        for room in Room.objects.select_for_update().filter(number__in=rows):
+            fields = [field for field, value in rows[room.number].items() if getattr(room, field) != value]
+            if not fields:
+                continue
+            for field in fields:
+                setattr(room, field, rows[room.number][field])
+            changed_rooms.append(room)
+            changed_fields.update(fields)
+            field_count += len(fields)
+        if changed_rooms:
+            Room.objects.bulk_update(changed_rooms, sorted(changed_fields))
+
+    if changed_rooms:
+        # bulk_update skips post_save
+        invalidate_stats()
+        bump_change_version()
+        bump_catalog_version()
+        publish('rooms')
+    return len(changed_rooms), field_count
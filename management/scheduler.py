@@ -0,0 +1,69 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from .conditional import cache_is_shared
+
+logger = logging.getLogger(__name__)
+
+_started = False
+_lock = threading.Lock()
+
+
+def scheduled_jobs():
+    from .jobs import purge_expired_registrations
+    from .rack import reconcile_room_statuses
+
+    return [
+        ('purge_expired_registrations', purge_expired_registrations, settings.PURGE_INTERVAL_SECONDS),
+        ('reconcile_room_statuses', reconcile_room_statuses, settings.ROOM_RECONCILE_INTERVAL_SECONDS),
+    ]
+
+
+def run_job(name, func, interval):
+    # Every worker process runs a scheduler; the cache lock lets only one of
+    # them execute a given job per interval. That needs a shared cache: with
+    # CACHE_BACKEND=locmem each worker holds its own lock and runs every job
+    # (the jobs are idempotent, so this only costs duplicate work).
+    if not cache.add(f'scheduler-lock:{name}', True, interval):
+        return None
+    try:
+        result = func()
+        logger.info("%s: %s", name, result)
+        return result
+    except Exception:
+        logger.exception("Scheduled job %s failed", name)
+        return None
+    finally:
+        close_old_connections()
+
+
+def _loop(jobs):
+    next_run = {name: 0 for name, _, _ in jobs}
+    while True:
+        now = time.monotonic()
+        for name, func, interval in jobs:
+            if now >= next_run[name]:
+                run_job(name, func, interval)
+                next_run[name] = now + interval
+        time.sleep(max(1, min(next_run.values()) - time.monotonic()))
+
+
+def start_scheduler():
+    """Starts the background job thread once per process (no-op when disabled)."""
+    global _started
+    if not settings.BACKGROUND_JOBS_ENABLED:
+        return
+    with _lock:
+        if _started:
+            return
+        _started = True
+
+    if not cache_is_shared():
+        logger.warning("Cache is not shared between processes; every worker will run each background job")
+    thread = threading.Thread(target=_loop, args=(scheduled_jobs(),), name='kegama-scheduler', daemon=True)
+    thread.start()
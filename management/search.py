@@ -0,0 +1,140 @@
+import re
+
+from django.db import transaction
+from django.db.models import Count, Max, Q
+
+from .models import GuestRegistration, GuestSearchTerm
+
+SEARCH_FIELDS = ('first_name', 'last_name', 'room_number', 'booking_id', 'phone')
+REBUILD_BATCH_SIZE = 500
+RETURNING_GUEST_LIMIT = 10
+
+_NON_ALNUM = re.compile(r'[^0-9A-Z]+')
+
+
+def normalize_words(text):
+    return [word for word in _NON_ALNUM.split((text or '').upper()) if word]
+
+
+def trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def guest_terms(guest):
+    """(words, trigrams) indexed for one guest."""
+    words = set()
+    for field in SEARCH_FIELDS:
+        words.update(normalize_words(getattr(guest, field)))
+    # "0917 123 4567" should also match a query typed without spaces
+    phone_digits = re.sub(r'\D', '', guest.phone or '')
+    if phone_digits:
+        words.add(phone_digits)
+
+    grams = set()
+    for word in words:
+        grams |= trigrams(word)
+    return words, grams
+
+
+def _term_rows(guest):
+    words, grams = guest_terms(guest)
+    return (
+        [GuestSearchTerm(guest_id=guest.pk, kind=GuestSearchTerm.WORD, term=w[:100]) for w in words] +
+        [GuestSearchTerm(guest_id=guest.pk, kind=GuestSearchTerm.TRIGRAM, term=g) for g in grams]
+    )
+
+
+def index_guest(guest):
+    with transaction.atomic():
+        GuestSearchTerm.objects.filter(guest_id=guest.pk).delete()
+        GuestSearchTerm.objects.bulk_create(_term_rows(guest))
+
+
+def rebuild_index(batch_size=REBUILD_BATCH_SIZE):
+    """Re-indexes every guest; returns the number of guests indexed."""
+    guests = GuestRegistration.objects.only('id', *SEARCH_FIELDS).order_by('pk')
+    indexed = 0
+    with transaction.atomic():
+        GuestSearchTerm.objects.all().delete()
+        rows = []
+        for guest in guests.iterator(chunk_size=batch_size):
+            rows.extend(_term_rows(guest))
+            indexed += 1
+            if len(rows) >= batch_size:
+                GuestSearchTerm.objects.bulk_create(rows)
+                rows = []
+        GuestSearchTerm.objects.bulk_create(rows)
+    return indexed
+
+
+def _prefix_upper_bound(word):
+    return word[:-1] + chr(ord(word[-1]) + 1)
+
+
+def search(query, queryset=None):
+    """
+    Narrows `queryset` to guests matching every word of `query`: words of
+    three or more characters match as substrings of one indexed word (the
+    trigram index narrows the candidates, then each is checked), shorter ones
+    as word prefixes. Ordering is left to the caller.
+    """
+    if queryset is None:
+        queryset = GuestRegistration.objects.all()
+
+    words = normalize_words(query)
+    if not words:
+        return queryset.none()
+
+    for word in words:
+        if len(word) >= 3:
+            grams = trigrams(word)
+            candidates = (
+                GuestSearchTerm.objects.filter(kind=GuestSearchTerm.TRIGRAM, term__in=grams)
+                .values('guest_id')
+                .annotate(hits=Count('term'))
+                .filter(hits=len(grams))
+                .values('guest_id')
+            )
+            # All trigrams may come from different words ("ANAN" in "ANA NANCY")
+            matches = GuestSearchTerm.objects.filter(
+                guest_id__in=candidates, kind=GuestSearchTerm.WORD, term__contains=word
+            ).values('guest_id')
+        else:
+            # Range instead of LIKE so the (kind, term) index is usable on every backend
+            matches = GuestSearchTerm.objects.filter(
+                kind=GuestSearchTerm.WORD, term__gte=word, term__lt=_prefix_upper_bound(word)
+            ).values('guest_id')
+        queryset = queryset.filter(id__in=matches)
+    return queryset
+
+
+def returning_guests(query, limit=RETURNING_GUEST_LIMIT):
+    """
+    Most recent registration of each distinct (first_name, last_name, phone)
+    matching `query`, newest first. Grouping happens in SQL so `limit`
+    always counts unique guests.
+    """
+    groups = list(
+        search(query)
+        .values('first_name', 'last_name', 'phone')
+        .annotate(latest=Max('created_at'))
+        .order_by('-latest')[:limit]
+    )
+    if not groups:
+        return []
+
+    match = Q()
+    for group in groups:
+        match |= Q(first_name=group['first_name'], last_name=group['last_name'],
+                   phone=group['phone'], created_at=group['latest'])
+    rows = GuestRegistration.objects.filter(match).values(
+        'id', 'first_name', 'last_name', 'phone', 'address', 'created_at'
+    )
+
+    by_key = {}
+    for row in rows:
+        by_key.setdefault((row['first_name'], row['last_name'], row['phone']), row)
+    return [
+        by_key[key] for key in ((g['first_name'], g['last_name'], g['phone']) for g in groups)
+        if key in by_key
+    ]
@@ -0,0 +1,83 @@
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from .catalog import bump_catalog_version
+from .conditional import bump_change_version
+from .events import publish
+from .intervals import bump_stays_version
+from .models import Amenity, GuestRegistration, Room, AuditLog
+from .rollup import ROLLUP_FIELDS, bucket_of, refresh_bucket
+from .search import SEARCH_FIELDS, index_guest
+from .stats import invalidate_stats
+
+
+@receiver([post_save, post_delete], sender=GuestRegistration)
+@receiver([post_save, post_delete], sender=Room)
+def clear_cached_stats(sender, **kwargs):
+    invalidate_stats()
+
+
+@receiver([post_save, post_delete], sender=GuestRegistration)
+@receiver([post_save, post_delete], sender=Room)
+@receiver([post_save, post_delete], sender=AuditLog)
+def bump_polling_version(sender, **kwargs):
+    bump_change_version()
+
+
+@receiver([post_save, post_delete], sender=Room)
+@receiver([post_save, post_delete], sender=Amenity)
+@receiver(m2m_changed, sender=Room.amenities.through)
+def retire_room_catalog(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver([post_save, post_delete], sender=GuestRegistration)
+def retire_stay_index(sender, **kwargs):
+    bump_stays_version()
+
+
+@receiver([post_save, post_delete], sender=GuestRegistration)
+def publish_guest_event(sender, **kwargs):
+    publish('guests')
+
+
+@receiver([post_save, post_delete], sender=Room)
+def publish_room_event(sender, **kwargs):
+    publish('rooms')
+
+
+@receiver(post_save, sender=GuestRegistration)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    index_guest(instance)
+
+
+def _touches_rollup(update_fields):
+    return update_fields is None or bool(set(update_fields) & set(ROLLUP_FIELDS))
+
+
+@receiver(pre_save, sender=GuestRegistration)
+def remember_revenue_bucket(sender, instance, update_fields=None, **kwargs):
+    instance._revenue_bucket = None
+    if instance._state.adding or not _touches_rollup(update_fields):
+        return
+    old = sender.objects.filter(pk=instance.pk).values_list('created_at', 'source', 'mode_of_payment').first()
+    if old:
+        instance._revenue_bucket = bucket_of(*old)
+
+
+@receiver(post_save, sender=GuestRegistration)
+def update_revenue_rollup(sender, instance, update_fields=None, **kwargs):
+    if not _touches_rollup(update_fields):
+        return
+    new = bucket_of(instance.created_at, instance.source, instance.mode_of_payment)
+    refresh_bucket(*new)
+    old = getattr(instance, '_revenue_bucket', None)
+    if old and old != new:
+        refresh_bucket(*old)
+
+
+@receiver(post_delete, sender=GuestRegistration)
+def remove_from_revenue_rollup(sender, instance, **kwargs):
+    refresh_bucket(*bucket_of(instance.created_at, instance.source, instance.mode_of_payment))
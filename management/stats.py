@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import GuestRegistration, Room
+
+GUEST_STATS_KEY = 'stats:guests'
+ROOM_STATS_KEY = 'stats:rooms'
+# Signals clear these on every write; the timeout only bounds staleness from
+# queryset .update() calls, which bypass post_save.
+STATS_CACHE_TIMEOUT = 60 * 5
+
+
+def guest_stats():
+    """Dashboard and analytics counters for GuestRegistration in one query."""
+    today = timezone.now().date()
+    stats = cache.get(GUEST_STATS_KEY)
+    if stats and stats['day'] == today:
+        return stats
+
+    stats = GuestRegistration.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status='PRINTED', check_out_date__gte=today)),
+        pending=Count('id', filter=Q(status='PENDING')),
+        today_checkins=Count('id', filter=Q(check_in_date=today)),
+        revenue=Sum('total_amount'),
+    )
+    stats['revenue'] = stats['revenue'] or 0
+    stats['day'] = today
+    cache.set(GUEST_STATS_KEY, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def room_stats():
+    """Room status counters in one query."""
+    stats = cache.get(ROOM_STATS_KEY)
+    if stats:
+        return stats
+
+    stats = Room.objects.aggregate(
+        total=Count('number'),
+        available=Count('number', filter=Q(status='AVAILABLE')),
+        occupied=Count('number', filter=Q(status='OCCUPIED')),
+        maintenance=Count('number', filter=Q(status='MAINTENANCE')),
+    )
+    cache.set(ROOM_STATS_KEY, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def invalidate_stats():
+    cache.delete_many([GUEST_STATS_KEY, ROOM_STATS_KEY])
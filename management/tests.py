@@ -1,8 +1,38 @@
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from django.db import connection
+from unittest import skipUnless, mock
+from django.core.management import call_command
 from django.urls import reverse
 from django.core.cache import cache
-from .models import GuestRegistration, AdminSettings, AuditLog, Room, Amenity
+from django.core.cache.backends.base import CacheKeyWarning
+from django.utils import timezone
+from datetime import date, timedelta
+from .models import GuestRegistration, AdminSettings, AuditLog, Room, Amenity, GuestSearchTerm, DailyRevenue
+from .pagination import GUEST_PAGE_SIZE
+from .stats import guest_stats, room_stats
+from .jobs import purge_expired_registrations
+from .rollup import rebuild_rollup
+from .rack import reconcile_room_statuses
+from .occupancy import OccupancyMatrix
+from .intervals import Stay, StayIndex, get_stay_index
+from .catalog import get_catalog
+from .timeline import build_timeline
+from .search import search, rebuild_index, returning_guests
+from .events import event_stream, publish
+from . import pdf_cache
+from kegama_residences.cache import TieredCache
+from .pdf import PDF_STYLESHEETS, PdfEngine, PdfRenderPool, PdfRendererBusy, stylesheet_path
+from io import StringIO
+import csv
+import json
+import os
+import tempfile
+import time
+import re
 import uuid
+import warnings
 
 class RoomModelTest(TestCase):
     def test_create_room_with_amenities(self):
@@ -41,6 +71,101 @@ class GuestRegistrationModelTest(TestCase):
         self.assertEqual(guest.status, 'PENDING')
         self.assertTrue(guest.booking_id) # Should be auto-generated
 
+class AdminSettingsCacheTest(TestCase):
+    def setUp(self):
+        AdminSettings._cached = None
+        AdminSettings.load()
+
+    def test_load_without_queries(self):
+        with self.assertNumQueries(0):
+            AdminSettings.load()
+            Client().get(reverse('guest_form_page'))
+
+    def test_save_is_seen_by_this_and_other_workers(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            settings_obj = AdminSettings.load()
+            settings_obj.maintenance_mode = True
+            settings_obj.save()
+        self.assertTrue(AdminSettings.load().maintenance_mode)
+
+        # Another worker's save: the row and the shared version move, this process's copy does not
+        AdminSettings.objects.filter(pk=1).update(form_access_code='1234')
+        cache.incr(AdminSettings.VERSION_KEY)
+        self.assertEqual(AdminSettings.load().form_access_code, '')
+        later = time.monotonic() + AdminSettings.RECHECK_SECONDS
+        with mock.patch('management.models.time.monotonic', return_value=later):
+            self.assertEqual(AdminSettings.load().form_access_code, '1234')
+
+    def test_version_is_only_trusted_in_a_shared_cache(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            AdminSettings._cached = None
+            AdminSettings.load()
+            later = time.monotonic() + AdminSettings.RECHECK_SECONDS
+            # Another worker's save, whose version bump never reaches this process
+            AdminSettings.objects.filter(pk=1).update(pin_code='0000')
+            with mock.patch('management.models.time.monotonic', return_value=later):
+                self.assertEqual(AdminSettings.load().pin_code, '0000')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            shared = {'BACKEND': 'kegama_residences.cache.SQLiteCache', 'LOCATION': os.path.join(tmp, 'cache.sqlite3')}
+            with override_settings(CACHES={'default': {'BACKEND': 'kegama_residences.cache.TieredCache',
+                                                       'OPTIONS': {'SHARED': shared}}}):
+                AdminSettings._cached = None
+                AdminSettings.load()
+                with mock.patch('management.models.time.monotonic', return_value=later + 1), self.assertNumQueries(0):
+                    AdminSettings.load()
+
+    def test_recheck_reads_past_the_local_cache_tier(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            shared = {'BACKEND': 'kegama_residences.cache.SQLiteCache', 'LOCATION': os.path.join(tmp, 'cache.sqlite3')}
+            tiered = {'BACKEND': 'kegama_residences.cache.TieredCache', 'OPTIONS': {'SHARED': shared, 'LOCAL_TIMEOUT': 60}}
+            with override_settings(CACHES={'default': tiered}):
+                AdminSettings._cached = None
+                AdminSettings.load()
+                # Another worker saves: its own cache bumps the shared version
+                AdminSettings.objects.filter(pk=1).update(maintenance_mode=True)
+                TieredCache('', tiered).incr(AdminSettings.VERSION_KEY)
+                later = time.monotonic() + AdminSettings.RECHECK_SECONDS
+                with mock.patch('management.models.time.monotonic', return_value=later):
+                    self.assertTrue(AdminSettings.load().maintenance_mode)
+
+    def test_load_returns_copies(self):
+        AdminSettings.load().policy_text = 'changed'
+        self.assertNotEqual(AdminSettings.load().policy_text, 'changed')
+
+
+class SharedCacheTierTest(TestCase):
+    """Two TieredCache instances over one SQLite file stand in for two workers."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        shared = {'BACKEND': 'kegama_residences.cache.SQLiteCache', 'LOCATION': os.path.join(tmp.name, 'cache.sqlite3')}
+        self.workers = [TieredCache('', {'OPTIONS': {'SHARED': shared, 'LOCAL_TIMEOUT': 1}}) for _ in range(2)]
+
+    def test_counters_are_shared(self):
+        a, b = self.workers
+        self.assertTrue(a.add('hits', 0))
+        self.assertFalse(b.add('hits', 0))
+        a.incr('hits')
+        self.assertEqual(b.incr('hits'), 2)
+
+    def test_reads_refresh_after_local_timeout(self):
+        a, b = self.workers
+        a.set('page', {'v': 1})
+        self.assertEqual(b.get('page'), {'v': 1})
+        a.set('page', {'v': 2})
+        self.assertEqual(b.get('page'), {'v': 1})
+        later = time.monotonic() + 1
+        with mock.patch('kegama_residences.cache.time.monotonic', return_value=later):
+            self.assertEqual(b.get('page'), {'v': 2})
+
+        b.get('page')['v'] = 3
+        self.assertEqual(b.get('page'), {'v': 2})
+        b.delete('page')
+        self.assertIsNone(b.get('page'))
+
+
 class GeneralTests(TestCase):
     def test_service_worker_served_at_root(self):
         client = Client()
@@ -164,4 +289,995 @@ class AdminViewsTest(TestCase):
         log = AuditLog.objects.first()
         self.assertIsNotNone(log)
         self.assertEqual(log.action, 'LOGIN')
-        self.assertIn('Admin logged in', log.details)
\ No newline at end of file
+        self.assertIn('Admin logged in', log.details)
+
+class DashboardPaginationTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+
+        now = timezone.now()
+        self.this_month = now.replace(day=15, hour=12, minute=0, second=0, microsecond=0)
+        self.last_month = (self.this_month.replace(day=1) - timedelta(days=1)).replace(day=15)
+
+        for i in range(GUEST_PAGE_SIZE + 5):
+            guest = GuestRegistration.objects.create(
+                first_name=f"GUEST{i}", last_name="OLD", address="X", phone="1", status='PRINTED'
+            )
+            # Identical timestamps force the id tie-breaker in the cursor
+            GuestRegistration.objects.filter(id=guest.id).update(created_at=self.last_month)
+        for i in range(3):
+            guest = GuestRegistration.objects.create(
+                first_name=f"GUEST{i}", last_name="NEW", address="X", phone="1", status='PRINTED'
+            )
+            GuestRegistration.objects.filter(id=guest.id).update(created_at=self.this_month - timedelta(hours=i))
+
+    def test_dashboard_groups_months_in_sql(self):
+        response = self.client.get(reverse('dashboard'))
+        sections = response.context['month_sections']
+        self.assertEqual([s['count'] for s in sections], [3, GUEST_PAGE_SIZE + 5])
+        self.assertEqual(len(sections[0]['guests']), 3)
+        self.assertIsNone(sections[0]['next_cursor'])
+        self.assertNotIn('guests', sections[1])
+
+    def test_month_pages_follow_keyset_cursor(self):
+        url = reverse('dashboard_month')
+        key = timezone.localtime(self.last_month).strftime('%Y-%m')
+
+        first = self.client.get(url, {'month': key})
+        self.assertEqual(len(first.context['guests']), GUEST_PAGE_SIZE)
+        self.assertIsNotNone(first.context['next_cursor'])
+
+        second = self.client.get(url, {'month': key, 'cursor': first.context['next_cursor']})
+        self.assertEqual(len(second.context['guests']), 5)
+        self.assertIsNone(second.context['next_cursor'])
+
+        seen = {g.id for g in first.context['guests']} | {g.id for g in second.context['guests']}
+        self.assertEqual(len(seen), GUEST_PAGE_SIZE + 5)
+
+    def test_invalid_month_rejected(self):
+        for month in ('nope', '9999-12'):
+            response = self.client.get(reverse('dashboard_month'), {'month': month})
+            self.assertEqual(response.status_code, 400, month)
+        self.assertEqual(self.client.get(reverse('dashboard_month'), {'month': '9999-11'}).status_code, 200)
+
+
+class StatsServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_guest_stats_single_query_and_cached(self):
+        today = timezone.now().date()
+        GuestRegistration.objects.create(first_name="A", last_name="B", address="X", phone="1", check_in_date=today, total_amount=500)
+        GuestRegistration.objects.create(first_name="C", last_name="D", address="X", phone="1", status='PRINTED', check_out_date=today, total_amount=700)
+
+        with self.assertNumQueries(1):
+            stats = guest_stats()
+        self.assertEqual(stats['total'], 2)
+        self.assertEqual(stats['pending'], 1)
+        self.assertEqual(stats['active'], 1)
+        self.assertEqual(stats['today_checkins'], 1)
+        self.assertEqual(stats['revenue'], 1200)
+
+        with self.assertNumQueries(0):
+            guest_stats()
+
+    def test_writes_invalidate_cached_stats(self):
+        self.assertEqual(guest_stats()['total'], 0)
+        self.assertEqual(room_stats()['total'], 0)
+
+        GuestRegistration.objects.create(first_name="A", last_name="B", address="X", phone="1")
+        room = Room.objects.create(number="101", floor="1st Floor", price=1500, status='MAINTENANCE')
+        self.assertEqual(guest_stats()['total'], 1)
+        self.assertEqual(room_stats()['maintenance'], 1)
+
+        room.delete()
+        self.assertEqual(room_stats()['total'], 0)
+
+
+class ConditionalPollingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+
+    def test_unchanged_poll_returns_304(self):
+        for name in ('dashboard', 'room_rack', 'calendar_view'):
+            url = reverse(name)
+            first = self.client.get(url, HTTP_HX_REQUEST='true')
+            self.assertEqual(first.status_code, 200)
+            etag = first['ETag']
+
+            second = self.client.get(url, HTTP_HX_REQUEST='true', HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(second.status_code, 304, name)
+
+    def test_write_changes_etag(self):
+        url = reverse('dashboard')
+        etag = self.client.get(url, HTTP_HX_REQUEST='true')['ETag']
+
+        GuestRegistration.objects.create(first_name="A", last_name="B", address="X", phone="1")
+
+        response = self.client.get(url, HTTP_HX_REQUEST='true', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_partial_and_full_page_have_distinct_etags(self):
+        url = reverse('dashboard')
+        partial = self.client.get(url, HTTP_HX_REQUEST='true')['ETag']
+        full = self.client.get(url)['ETag']
+        self.assertNotEqual(partial, full)
+
+
+class PurgeExpiredRegistrationsTest(TestCase):
+    def setUp(self):
+        expired = timezone.now() - timedelta(hours=2)
+        for i in range(5):
+            guest = GuestRegistration.objects.create(first_name=f"OLD{i}", last_name="X", address="X", phone="1")
+            GuestRegistration.objects.filter(id=guest.id).update(created_at=expired)
+        printed = GuestRegistration.objects.create(first_name="KEEP", last_name="X", address="X", phone="1", status='PRINTED')
+        GuestRegistration.objects.filter(id=printed.id).update(created_at=expired)
+        GuestRegistration.objects.create(first_name="FRESH", last_name="X", address="X", phone="1")
+
+    def test_purge_runs_in_batches(self):
+        result = purge_expired_registrations(batch_size=2)
+        self.assertEqual(result['deleted'], 5)
+        self.assertEqual(result['batches'], 3)
+        self.assertEqual(
+            set(GuestRegistration.objects.values_list('first_name', flat=True)), {'KEEP', 'FRESH'}
+        )
+
+    def test_command_reports_counts(self):
+        out = StringIO()
+        call_command('purge_expired_registrations', batch_size=10, stdout=out)
+        self.assertIn('Deleted 5 expired registrations in 1 batches', out.getvalue())
+
+    def test_dashboard_does_not_purge(self):
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+        self.client.get(reverse('dashboard'))
+        self.assertEqual(GuestRegistration.objects.count(), 7)
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite specific")
+class QueryPlanTest(TestCase):
+    """
+    Runs EXPLAIN QUERY PLAN on every filtered GuestRegistration query the
+    manager views issue against a few years of seeded history, and fails if
+    SQLite has to scan the table instead of searching an index.
+    Unfiltered whole-history aggregates are out of scope (they are cached).
+    """
+    SEED_DAYS = 3 * 365
+    GUESTS_PER_DAY = 3
+    ROOMS = [f"{floor}0{n}" for floor in range(1, 5) for n in range(1, 6)]
+
+    @classmethod
+    def setUpTestData(cls):
+        Room.objects.bulk_create([Room(number=n, floor=f"Floor {n[0]}", price=1500) for n in cls.ROOMS])
+
+        now = timezone.now()
+        guests = []
+        for day in range(cls.SEED_DAYS):
+            created = now - timedelta(days=day)
+            for i in range(cls.GUESTS_PER_DAY):
+                check_in = created.date()
+                guests.append(GuestRegistration(
+                    first_name=f"GUEST{day}", last_name=f"L{i}", address="X", phone=f"09{day:05d}{i}",
+                    room_number=cls.ROOMS[(day + i) % len(cls.ROOMS)],
+                    status='PRINTED' if day < 3 else 'CHECKED_OUT',
+                    check_in_date=check_in, check_out_date=check_in + timedelta(days=1),
+                    total_amount=1500,
+                ))
+        GuestRegistration.objects.bulk_create(guests)
+        for guest, offset in zip(guests, range(len(guests))):
+            guest.created_at = now - timedelta(days=offset // cls.GUESTS_PER_DAY, minutes=offset % cls.GUESTS_PER_DAY)
+        # bulk_update skips auto_now_add, so the history keeps its spread
+        GuestRegistration.objects.bulk_update(guests, ['created_at'], batch_size=500)
+        rebuild_rollup()
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        cache.clear()
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+
+    def table_scans(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            details = [row[-1] for row in cursor.fetchall()]
+        return [d for d in details if re.match(r'SCAN management_(guestregistration|guestsearchterm)(?! USING)', d)]
+
+    def assertIndexedPlans(self, url, data=None, **headers):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, data or {}, **headers)
+        self.assertEqual(response.status_code, 200)
+
+        checked = 0
+        for query in ctx.captured_queries:
+            sql = query['sql']
+            filtered = ' WHERE ' in sql.replace('FILTER (WHERE', '')
+            if not sql.startswith('SELECT') or 'management_guestregistration' not in sql or not filtered:
+                continue
+            checked += 1
+            self.assertEqual(self.table_scans(sql), [], f"Full table scan for {url}: {sql}")
+        self.assertGreater(checked, 0, f"No filtered GuestRegistration queries captured for {url}")
+
+    def test_dashboard(self):
+        self.assertIndexedPlans(reverse('dashboard'), HTTP_HX_REQUEST='true')
+
+    def test_dashboard_month(self):
+        key = (timezone.localdate() - timedelta(days=400)).strftime('%Y-%m')
+        self.assertIndexedPlans(reverse('dashboard_month'), {'month': key})
+
+    def test_room_rack(self):
+        self.assertIndexedPlans(reverse('room_rack'))
+
+    def test_calendar_view(self):
+        self.assertIndexedPlans(reverse('calendar_view'))
+
+    def test_update_guest(self):
+        guest = GuestRegistration.objects.filter(status='PRINTED').first()
+        self.assertIndexedPlans(reverse('update_guest', args=[guest.id]))
+
+    def test_analytics(self):
+        for filter_type in ('daily', 'weekly', 'monthly', 'yearly'):
+            self.assertIndexedPlans(reverse('analytics_dashboard'), {'filter': filter_type})
+
+    def test_analytics_revenue_reads_rollup(self):
+        for filter_type in ('daily', 'weekly', 'monthly', 'yearly'):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse('analytics_dashboard'), {'filter': filter_type})
+            self.assertTrue(any(point['revenue'] for point in response.context['chart']['series']))
+            guest_sums = [q['sql'] for q in ctx.captured_queries
+                          if 'management_guestregistration' in q['sql'] and ' WHERE ' in q['sql'] and 'SUM(' in q['sql']]
+            self.assertEqual(guest_sums, [])
+
+    def test_availability_api(self):
+        self.assertIndexedPlans(reverse('availability_api'), {'nights': 3, 'pax': 2})
+
+    def test_guest_search(self):
+        self.assertIndexedPlans(reverse('dashboard'), {'q': 'guest12 l1'}, HTTP_HX_REQUEST='true')
+        self.assertIndexedPlans(reverse('search_guests'), {'q': 'gu'})
+
+    def test_purge_expired_registrations(self):
+        cutoff = timezone.now() - timedelta(hours=1)
+        sql, params = (
+            GuestRegistration.objects.filter(status='PENDING', created_at__lt=cutoff)
+            .order_by('created_at').values('id')[:500].query.sql_with_params()
+        )
+        with connection.cursor() as cursor:
+            sql = connection.ops.last_executed_query(cursor, sql, params)
+        self.assertEqual(self.table_scans(sql), [])
+
+
+class GuestSearchIndexTest(TestCase):
+    def setUp(self):
+        self.juan = GuestRegistration.objects.create(
+            first_name="JUAN", last_name="DELA CRUZ", address="X", phone="0917 123 4567", room_number="201"
+        )
+        self.maria = GuestRegistration.objects.create(
+            first_name="MARIA", last_name="SANTOS", address="X", phone="0918 765 4321", room_number="305"
+        )
+
+    def names(self, query):
+        return set(search(query).values_list('first_name', flat=True))
+
+    def test_substring_prefix_and_phone_lookups(self):
+        self.assertEqual(self.names('ela cr'), {'JUAN'})
+        self.assertEqual(self.names('ma'), {'MARIA'})
+        self.assertEqual(self.names('santos'), {'MARIA'})
+        self.assertEqual(self.names('09171234'), {'JUAN'})
+        self.assertEqual(self.names(self.maria.booking_id.lower()), {'MARIA'})
+        self.assertEqual(self.names('zzz'), set())
+
+    def test_trigrams_must_come_from_one_word(self):
+        GuestRegistration.objects.create(first_name="ANA", last_name="NANCY", address="X", phone="0912348345")
+        self.assertEqual(self.names('anan'), set())
+        self.assertEqual(self.names('12345'), {'JUAN'})  # 0917 1234567, not ANA's 0912348345
+        self.assertEqual(self.names('12348'), {'ANA'})
+
+    def test_index_follows_save_and_delete(self):
+        self.juan.last_name = "REYES"
+        self.juan.save()
+        self.assertEqual(self.names('cruz'), set())
+        self.assertEqual(self.names('reyes'), {'JUAN'})
+
+        self.juan.delete()
+        self.assertFalse(GuestSearchTerm.objects.filter(guest_id=self.juan.id).exists())
+
+    def test_rebuild_index(self):
+        GuestSearchTerm.objects.all().delete()
+        self.assertEqual(rebuild_index(), 2)
+        self.assertEqual(self.names('juan'), {'JUAN'})
+
+
+class ReturningGuestSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+
+        # Twelve visits by the same guest would have crowded out everyone else
+        for day in range(12):
+            guest = GuestRegistration.objects.create(first_name="JUAN", last_name="CRUZ", address=f"VISIT {day}", phone="0917")
+            GuestRegistration.objects.filter(id=guest.id).update(created_at=timezone.now() - timedelta(days=day))
+        guest = GuestRegistration.objects.create(first_name="JUANA", last_name="REYES", address="OLD", phone="0918")
+        GuestRegistration.objects.filter(id=guest.id).update(created_at=timezone.now() - timedelta(days=30))
+
+    def test_deduplicated_in_sql_with_latest_visit(self):
+        guests = returning_guests('juan')
+        self.assertEqual([g['last_name'] for g in guests], ['CRUZ', 'REYES'])
+        self.assertEqual(guests[0]['address'], 'VISIT 0')
+
+    def test_results_cached_until_next_write(self):
+        url = reverse('search_guests')
+        self.assertContains(self.client.get(url, {'q': 'juan'}), 'VISIT 0')
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url, {'q': ' Juan '})
+        self.assertFalse([q for q in ctx.captured_queries if 'management_guest' in q['sql']])
+
+        GuestRegistration.objects.create(first_name="JUANITO", last_name="SY", address="NEW", phone="0919")
+        self.assertContains(self.client.get(url, {'q': 'juan'}), 'JUANITO')
+
+    def test_no_results(self):
+        self.assertContains(self.client.get(reverse('search_guests'), {'q': 'zzz'}), 'No guests found')
+
+    def test_cache_key_is_memcached_safe(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            self.assertContains(self.client.get(reverse('search_guests'), {'q': 'juan cruz'}), 'VISIT 0')
+
+
+class RoomReconcileTest(TestCase):
+    def setUp(self):
+        today = timezone.localdate()
+        Room.objects.create(number="101", floor="1", price=1000, status='AVAILABLE')
+        Room.objects.create(number="102", floor="1", price=1000, status='OCCUPIED')
+        Room.objects.create(number="103", floor="1", price=1000, status='DIRTY')
+        GuestRegistration.objects.create(first_name="IN", last_name="HOUSE", address="X", phone="1", status='PRINTED',
+                                         room_number="101", check_in_date=today, check_out_date=today + timedelta(days=1))
+        GuestRegistration.objects.create(first_name="LEFT", last_name="YESTERDAY", address="X", phone="1", status='PRINTED',
+                                         room_number="102", check_in_date=today - timedelta(days=2), check_out_date=today)
+
+    def statuses(self):
+        return dict(Room.objects.values_list('number', 'status'))
+
+    def test_rack_is_read_only(self):
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('room_rack'))
+        self.assertEqual(response.status_code, 200)
+        writes = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "management_room"')]
+        self.assertEqual(writes, [])
+        self.assertEqual(self.statuses(), {'101': 'AVAILABLE', '102': 'OCCUPIED', '103': 'DIRTY'})
+
+    def test_reconcile_in_one_update(self):
+        with CaptureQueriesContext(connection) as ctx:
+            result = reconcile_room_statuses()
+        self.assertEqual(result['changed'], 2)
+        self.assertEqual(len([q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]), 1)
+        self.assertEqual(self.statuses(), {'101': 'OCCUPIED', '102': 'AVAILABLE', '103': 'DIRTY'})
+        self.assertEqual(reconcile_room_statuses()['changed'], 0)
+
+
+class RoomBulkUpdateTest(TestCase):
+    def setUp(self):
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+        Room.objects.create(number="101", floor="1", price=1000, price_6hr=500, capacity=2)
+        Room.objects.create(number="102", floor="1", price=2000, capacity=4)
+
+    def form(self, **overrides):
+        data = {}
+        for room in Room.objects.all():
+            data.update({
+                f'price_{room.number}': f"{room.price:,.0f}", f'price_6hr_{room.number}': str(room.price_6hr),
+                f'price_10hr_{room.number}': str(room.price_10hr), f'capacity_{room.number}': str(room.capacity),
+                f'status_{room.number}': room.status,
+            })
+        data.update(overrides)
+        return data
+
+    def test_writes_only_changed_rooms_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('room_management'), self.form(price_101='1,200', capacity_101='3'))
+        self.assertEqual(response.status_code, 302)
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "management_room"')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn("'102'", updates[0])
+        room = Room.objects.get(number="101")
+        self.assertEqual((room.price, room.capacity), (1200, 3))
+        self.assertTrue(AuditLog.objects.filter(action='UPDATE_ROOMS', details__contains='1 rooms (2 fields changed)').exists())
+
+    def test_unchanged_form_writes_nothing(self):
+        self.client.post(reverse('room_management'), self.form())
+        self.assertFalse(AuditLog.objects.filter(action='UPDATE_ROOMS').exists())
+
+    def test_one_bad_row_rejects_all(self):
+        response = self.client.post(reverse('room_management'), self.form(price_101='1500', capacity_102='0'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Room 102', response.context['error'])
+        self.assertEqual(Room.objects.get(number="101").price, 1000)
+
+    def test_rejects_values_the_field_cannot_hold(self):
+        for value in ('nan', 'sNaN', 'Infinity', '99999999999'):
+            response = self.client.post(reverse('room_management'), self.form(price_101=value))
+            self.assertEqual(response.status_code, 200, value)
+            self.assertIn('Room 101', response.context['error'])
+        self.assertEqual(Room.objects.get(number="101").price, 1000)
+
+
+class RoomCatalogTest(TestCase):
+    def setUp(self):
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+        self.wifi = Amenity.objects.create(name="Wi-Fi")
+        Room.objects.create(number="201", floor="2", price=1000).amenities.add(self.wifi)
+        Room.objects.create(number="101", floor="1", price=1000)
+
+    def test_warm_catalog_reads_without_queries(self):
+        get_catalog()
+        with self.assertNumQueries(0):
+            catalog = get_catalog()
+            self.assertEqual(list(catalog.by_floor()), ["1", "2"])
+            self.assertEqual([a.name for a in catalog.get("201").amenities.all()], ["Wi-Fi"])
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('calendar_view'))
+        self.assertFalse([q for q in ctx.captured_queries if 'management_room' in q['sql']])
+
+    def test_room_and_amenity_writes_reload(self):
+        catalog = get_catalog()
+        self.assertIs(get_catalog(), catalog)
+        catalog.rooms()[0].is_occupied_today = True
+        self.assertFalse(hasattr(get_catalog().get("101"), 'is_occupied_today'))
+
+        Room.objects.get(number="101").amenities.add(self.wifi)
+        self.assertEqual(get_catalog().get("101").amenities.count(), 1)
+        self.client.post(reverse('room_management'), {'price_101': '1500', 'capacity_101': '2', 'status_101': 'AVAILABLE'})
+        self.assertEqual(get_catalog().get("101").price, 1500)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_reloads_on_a_timer_without_a_shared_cache(self):
+        catalog, index = get_catalog(), get_stay_index()
+        # Another worker's write, whose version bump never reaches this process
+        Room.objects.filter(number="101").update(price=1800)
+        self.assertIs(get_catalog(), catalog)
+        later = time.monotonic() + 1
+        with mock.patch('time.monotonic', return_value=later):
+            self.assertEqual(get_catalog().get("101").price, 1800)
+            self.assertIsNot(get_stay_index(), index)
+
+
+class RevenueRollupTest(TestCase):
+    def rollup(self):
+        return {
+            (row.source, row.mode_of_payment): (row.guests, row.revenue)
+            for row in DailyRevenue.objects.all()
+        }
+
+    def test_maintained_on_save_and_delete(self):
+        a = GuestRegistration.objects.create(first_name="A", last_name="A", address="X", phone="1", total_amount=1000)
+        GuestRegistration.objects.create(first_name="B", last_name="B", address="X", phone="1", total_amount=500)
+        self.assertEqual(self.rollup(), {('WALKIN', 'CASH'): (2, 1500)})
+
+        a.source = 'OYO'
+        a.total_amount = 1200
+        a.save()
+        self.assertEqual(self.rollup(), {('WALKIN', 'CASH'): (1, 500), ('OYO', 'CASH'): (1, 1200)})
+
+        a.delete()
+        self.assertEqual(self.rollup(), {('WALKIN', 'CASH'): (1, 500)})
+
+    def test_rebuild_matches_incremental(self):
+        for amount in (100, 200, 300):
+            GuestRegistration.objects.create(first_name="A", last_name="A", address="X", phone="1", total_amount=amount)
+        before = self.rollup()
+        DailyRevenue.objects.all().delete()
+        call_command('rebuild_revenue_rollup', stdout=StringIO())
+        self.assertEqual(self.rollup(), before)
+
+
+class OccupancyMatrixTest(TestCase):
+    def test_kpis(self):
+        d = lambda day: date(2026, 1, day)
+        matrix = OccupancyMatrix(d(1), d(10), rooms=['101', '102'], stays=[
+            ('101', date(2025, 12, 30), d(3), 4, '', 1000),  # 2 of 4 nights fall in range
+            ('102', d(5), d(5), 1, '6 Hrs', 500),
+            ('102', d(8), d(9), 1, '22 Hrs', 1200),  # holds the room on check-out day too
+            ('999', d(8), d(9), 1, '', 1200),  # not in inventory
+        ])
+        summary = matrix.summary()
+        self.assertEqual(summary['room_nights'], 5)
+        self.assertEqual(summary['available_room_nights'], 20)
+        self.assertAlmostEqual(summary['revenue'], 3700)
+        self.assertAlmostEqual(summary['occupancy'], 25)
+        self.assertAlmostEqual(summary['adr'], 740)
+        self.assertAlmostEqual(summary['revpar'], 185)
+
+        weeks = matrix.by_period('week')
+        self.assertEqual([w['date'] for w in weeks], [date(2025, 12, 29), d(5)])
+        self.assertEqual([w['room_nights'] for w in weeks], [2, 3])
+
+    def test_reads_confirmed_stays(self):
+        Room.objects.create(number="101", floor="1", price=1000)
+        today = timezone.localdate()
+        for status in ('PRINTED', 'PENDING'):
+            GuestRegistration.objects.create(
+                first_name="A", last_name="A", address="X", phone="1", status=status, room_number="101",
+                room_rate=1000, nights=1, check_in_date=today, check_out_date=today + timedelta(days=1),
+            )
+        summary = OccupancyMatrix(today, today).summary()
+        self.assertEqual(summary['room_nights'], 1)
+        self.assertEqual(summary['adr'], 1000)
+
+
+class StayIndexTest(TestCase):
+    def stay(self, guest_id, room, first, last, status='PRINTED'):
+        return Stay(guest_id, room, first, last, last + timedelta(days=1), status, 'A', 'B')
+
+    def test_range_queries(self):
+        d = lambda day: date(2026, 3, day)
+        index = StayIndex([
+            self.stay(1, '101', d(1), d(20)),  # long stay that covers later short ones
+            self.stay(2, '101', d(5), d(6)),
+            self.stay(3, '101', d(25), d(26), status='PENDING'),
+            self.stay(4, '102', d(10), d(12)),
+        ])
+        self.assertFalse(index.is_free('101', d(18), d(19)))
+        self.assertTrue(index.is_free('101', d(21), d(24)))
+        self.assertTrue(index.is_free('103', d(1), d(31)))
+        self.assertEqual([s.id for s in index.overlapping('101', d(6), d(25))], [1, 2, 3])
+        self.assertEqual([s.id for s in index.overlapping('101', d(6), d(25), exclude=1, statuses=('PRINTED',))], [2])
+        self.assertFalse(index.is_free('101', d(25), d(25)))
+        self.assertTrue(index.is_free('101', d(25), d(25), statuses=('PRINTED',)))
+        self.assertEqual(index.free_rooms(['101', '102', '103'], d(12), d(12)), ['103'])
+        self.assertEqual(index.free_rooms(['101', '102', '103'], d(13), d(13)), ['102', '103'])
+        self.assertEqual(set(index.stays_between(d(21), d(31))), {'101'})
+
+    def test_booking_conflicts_are_half_open(self):
+        d = lambda day: date(2026, 3, day)
+        index = StayIndex([
+            Stay(1, '101', d(1), d(3), d(3), 'PRINTED', 'A', 'B'),  # 22 Hrs: drawn through check-out day
+            Stay(2, '102', d(5), d(5), d(5), 'PRINTED', 'A', 'B'),  # same-day short stay
+            Stay(3, '103', d(1), d(9), d(10), 'PRINTED', 'A', 'B'),
+        ])
+        self.assertFalse(index.is_free('101', d(3), d(3)))
+        self.assertEqual(index.booked_rooms(d(3), d(4)), {'103'})  # 101 turns over on the 3rd
+        self.assertEqual(index.conflicts('101', d(3), d(5)), [])
+        self.assertEqual([s.id for s in index.conflicts('101', d(2), d(4))], [1])
+        self.assertEqual(index.conflicts('102', d(5), d(5)), [])
+        self.assertEqual(index.conflicts('103', d(10), d(12)), [])
+        self.assertEqual(index.conflicts('103', d(5), d(6), exclude=3), [])
+
+    def test_rebuilt_after_guest_writes(self):
+        today = timezone.localdate()
+        guest = GuestRegistration.objects.create(first_name="A", last_name="A", address="X", phone="1", status='PRINTED',
+                                                 room_number="101", stay_duration="22 Hrs",
+                                                 check_in_date=today, check_out_date=today + timedelta(days=1))
+        index = get_stay_index()
+        self.assertIs(get_stay_index(), index)
+        self.assertEqual(index.overlapping('101', today, today)[0].end_night, today + timedelta(days=1))
+
+        guest.status = 'CHECKED_OUT'
+        guest.save()
+        self.assertTrue(get_stay_index().is_free('101', today, today))
+
+
+class TimelineBuilderTest(TestCase):
+    def test_cells(self):
+        d = lambda day: date(2026, 3, day)
+        stay = lambda i, first, last: Stay(i, '101', first, last, last + timedelta(days=1), 'PRINTED', 'A', f"L{i}")
+        rooms = [Room(number='101'), Room(number='102')]
+        rows = build_timeline(d(1), d(5), rooms, {'101': [
+            stay(1, date(2026, 2, 27), d(2)),  # began last month
+            stay(2, d(2), d(3)),  # overlaps the first on the 2nd
+        ]})
+        cells = rows[0].cells
+        self.assertEqual([len(cell.bars) for cell in cells], [1, 2, 1, 0, 0])
+        first = cells[0].bars[0]
+        self.assertEqual((first.starts, first.label, first.span), (False, True, 2))
+        self.assertEqual([(b.stay.id, b.starts, b.ends) for b in cells[1].bars], [(1, False, True), (2, True, False)])
+        self.assertEqual(cells[2].bars[0].span, 1)
+        self.assertEqual(rows[1].room.number, '102')
+        self.assertFalse(any(cell.bars for cell in rows[1].cells))
+
+    def test_calendar_renders_bars(self):
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+        today = timezone.localdate()
+        Room.objects.create(number="101", floor="1", price=1000)
+        guest = GuestRegistration.objects.create(first_name="A", last_name="ZAMORA", address="X", phone="1", status='PRINTED',
+                                                 room_number="101", check_in_date=today, check_out_date=today + timedelta(days=1))
+        response = self.client.get(reverse('calendar_view'))
+        self.assertContains(response, reverse('update_guest', args=[guest.id]))
+        self.assertContains(response, 'Zamora')
+
+
+class TimelineRangeTest(TestCase):
+    def setUp(self):
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+        Room.objects.create(number="101", floor="1", price=1000)
+        GuestRegistration.objects.create(first_name="A", last_name="ACROSS", address="X", phone="1", status='PRINTED',
+                                         room_number="101", stay_duration='22 Hrs',
+                                         check_in_date=date(2026, 1, 30), check_out_date=date(2026, 2, 2))
+
+    def test_streams_one_section_per_month(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('timeline_range'), {'start': '2026-01', 'months': 3})
+            self.assertTrue(response.streaming)
+            parts = [part.decode() for part in response.streaming_content]
+        html = ''.join(parts)
+        self.assertEqual(len(parts), 5)  # shell head, three months, shell tail
+        for month in ('January 2026', 'February 2026', 'March 2026'):
+            self.assertIn(month, html)
+        self.assertEqual(html.count('Across'), 2)  # labelled in January and again where February starts
+        stay_loads = [q for q in ctx.captured_queries if 'FROM "management_guestregistration"' in q['sql']]
+        self.assertLessEqual(len(stay_loads), 1)
+
+    def test_months_are_clamped(self):
+        response = self.client.get(reverse('timeline_range'), {'start': '2026-01', 'months': 40})
+        self.assertEqual(len(list(response.streaming_content)), 12 + 2)
+
+    def test_start_is_clamped_to_representable_dates(self):
+        for start, months, first in (('9999-12', 3, 'September 9999'), ('9999-11', 3, 'September 9999'), ('0001-01', 1, 'February 0001')):
+            response = self.client.get(reverse('timeline_range'), {'start': start, 'months': months})
+            self.assertIn(first, b''.join(response.streaming_content).decode())
+
+    @mock.patch('management.views.render_pdf', return_value=b'%PDF-1.7 range')
+    def test_pdf_pages_by_month(self, render_pdf):
+        response = self.client.get(reverse('print_timeline_range'), {'start': '2026-01', 'months': 12})
+        self.assertEqual(response.content, b'%PDF-1.7 range')
+        html = render_pdf.call_args[0][0]
+        self.assertEqual(html.count('class="month-page"'), 12)
+        self.assertIn('December 2026', html)
+
+
+class AnalyticsApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+        Room.objects.create(number="101", floor="1", price=1000)
+        self.today = timezone.localdate()
+        GuestRegistration.objects.create(
+            first_name="A", last_name="A", address="X", phone="1", status='PRINTED', room_number="101",
+            room_rate=1000, nights=1, total_amount=1000,
+            check_in_date=self.today, check_out_date=self.today + timedelta(days=1),
+        )
+        self.url = reverse('analytics_api')
+        self.params = {'start': self.today.isoformat(), 'end': self.today.isoformat(), 'granularity': 'day'}
+
+    def test_series(self):
+        data = self.client.get(self.url, self.params).json()
+        self.assertEqual(data['granularity'], 'day')
+        self.assertEqual(data['series'], [{
+            'date': self.today.isoformat(), 'revenue': 1000.0, 'guests': 1,
+            'room_nights': 1, 'available_room_nights': 1, 'room_revenue': 1000.0,
+            'occupancy': 100.0, 'adr': 1000.0, 'revpar': 1000.0,
+        }])
+
+    def test_cached_until_write(self):
+        self.client.get(self.url, self.params)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url, self.params)
+        self.assertFalse([q for q in ctx.captured_queries if 'management_' in q['sql']])
+
+        GuestRegistration.objects.create(first_name="B", last_name="B", address="X", phone="1", total_amount=500)
+        self.assertEqual(self.client.get(self.url, self.params).json()['summary']['revenue'], 1500.0)
+
+    def test_rejects_bad_parameters(self):
+        for params in ({'granularity': 'hour'}, {'start': '2026-02-30'}, {'start': 'yesterday'}, {'end': '2026-1-5'},
+                       {'start': '2026-02-01', 'end': '2026-01-01'}, {'start': '1990-01-01'}):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400, params)
+
+    def test_requires_manager(self):
+        self.assertEqual(Client().get(self.url).status_code, 403)
+
+
+class AvailabilityApiTest(TestCase):
+    def setUp(self):
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+        self.day = date(2026, 5, 1)
+        Room.objects.create(number="101", floor="1", price=1500, price_6hr=600, price_10hr=900, capacity=2)
+        Room.objects.create(number="102", floor="1", price=2500, capacity=4)
+        Room.objects.create(number="103", floor="1", price=1500, capacity=4, status='MAINTENANCE')
+        self.guest = GuestRegistration.objects.create(
+            first_name="A", last_name="A", address="X", phone="1", status='PRINTED', room_number="102",
+            stay_duration='22 Hrs', nights=2, check_in_date=self.day, check_out_date=self.day + timedelta(days=2),
+        )
+        self.url = reverse('availability_api')
+
+    def free(self, **params):
+        return {room['number']: room['rate'] for room in self.client.get(self.url, params).json()['rooms']}
+
+    def test_free_rooms_with_rate(self):
+        self.assertEqual(self.free(check_in='2026-04-29', nights=1), {'101': 1500.0, '102': 2500.0})
+        self.assertEqual(self.free(check_in='2026-04-29', nights=3), {'101': 1500.0})
+        self.assertEqual(self.free(check_in='2026-05-02', hours=6), {'101': 600.0})
+        # Bookable again on check-out day
+        self.assertEqual(self.free(check_in='2026-04-29', nights=2), {'101': 1500.0, '102': 2500.0})
+        self.assertEqual(self.free(check_in='2026-05-03', nights=1), {'101': 1500.0, '102': 2500.0})
+        self.assertEqual(self.free(check_in='2026-05-03', hours=10), {'101': 900.0, '102': 0.0})
+        self.assertEqual(self.free(check_in='2026-04-29', pax=3), {'102': 2500.0})
+        self.assertEqual(self.free(check_in='2026-05-02', exclude=str(self.guest.id)), {'101': 1500.0, '102': 2500.0})
+
+    def test_same_day_short_stays(self):
+        GuestRegistration.objects.create(
+            first_name="B", last_name="B", address="X", phone="1", status='PRINTED', room_number="101",
+            stay_duration='6 Hrs', nights=0, check_in_date=date(2026, 5, 10), check_out_date=date(2026, 5, 10),
+        )
+        self.assertIn('101', self.free(check_in='2026-05-10', hours=6))
+        self.assertIn('101', self.free(check_in='2026-05-10', nights=1))
+
+    def test_rejects_bad_parameters(self):
+        for params in ({'hours': 8}, {'nights': 0}, {'pax': 'x'}, {'check_in': '2026-02-30'}, {'check_in': 'tomorrow'}, {'exclude': 'x'}):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400, params)
+
+    def test_requires_manager(self):
+        self.assertEqual(Client().get(self.url).status_code, 403)
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+        GuestRegistration.objects.create(first_name="ANA", last_name="CRUZ", address="X", phone="1", status='PRINTED',
+                                         notes="line one\nline two")
+        GuestRegistration.objects.create(first_name="BEN", last_name="CRUZ", address="X", phone="1")
+
+    def get(self, dataset, **params):
+        response = self.client.get(reverse('export_data', args=[dataset]), params)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_guests_csv(self):
+        rows = list(csv.DictReader(StringIO(self.get('guests'))))
+        self.assertEqual([row['first_name'] for row in rows], ["ANA", "BEN"])
+        self.assertEqual(rows[0]['notes'], "line one\nline two")
+
+    def test_csv_neutralizes_formulas(self):
+        GuestRegistration.objects.create(first_name="=HYPERLINK(\"x\")", last_name="-1+1", address="@SUM(A1)", phone="1",
+                                         additional_requests="\tcmd")
+        row = list(csv.DictReader(StringIO(self.get('guests'))))[-1]
+        self.assertEqual((row['first_name'], row['last_name'], row['address'], row['additional_requests']),
+                         ("'=HYPERLINK(\"x\")", "'-1+1", "'@SUM(A1)", "'\tcmd"))
+        self.assertEqual(row['phone'], '1')
+
+    def test_rejects_malformed_dates(self):
+        for params in ({'start': 'yesterday'}, {'end': '2026-13-01'}):
+            self.assertEqual(self.client.get(reverse('export_data', args=['guests']), params).status_code, 400, params)
+
+    def test_filters(self):
+        lines = self.get('guests', format='jsonl', status='PRINTED').splitlines()
+        self.assertEqual([json.loads(line)['first_name'] for line in lines], ["ANA"])
+
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        self.assertEqual(self.get('guests', format='jsonl', start=tomorrow.isoformat()), '')
+
+        actions = [json.loads(line)['action'] for line in self.get('audit-log', format='jsonl').splitlines()]
+        self.assertIn('EXPORT_DATA', actions)
+
+    def test_rejects_bad_parameters(self):
+        for dataset, params in (('rooms', {}), ('guests', {'format': 'xml'}), ('guests', {'status': 'NOPE'}),
+                                ('guests', {'start': '2026-02-30'})):
+            response = self.client.get(reverse('export_data', args=[dataset]), params)
+            self.assertEqual(response.status_code, 400, (dataset, params))
+
+    def test_command(self):
+        out = StringIO()
+        call_command('export_data', 'guests', '--format', 'jsonl', '--status', 'PENDING', stdout=out)
+        self.assertEqual([json.loads(line)['first_name'] for line in out.getvalue().splitlines()], ["BEN"])
+
+
+class LiveEventsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    async def test_stream_emits_published_topics(self):
+        stream = event_stream(['guests', 'rooms'], lifetime=5)
+        self.assertEqual(await anext(stream), 'retry: 3000\n\n')
+        # Current state is sent on connect
+        self.assertEqual(await anext(stream), 'event: guests\ndata: 0\n\n')
+        self.assertEqual(await anext(stream), 'event: rooms\ndata: 0\n\n')
+
+        publish('rooms')
+        self.assertEqual(await anext(stream), 'event: rooms\ndata: 1\n\n')
+        await stream.aclose()
+
+    def test_room_save_publishes_event(self):
+        Room.objects.create(number="101", floor="1st Floor", price=1500)
+        self.assertEqual(cache.get('events:rooms'), 1)
+
+    def test_wsgi_request_gets_no_stream(self):
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+        self.assertEqual(self.client.get(reverse('live_events')).status_code, 204)
+        # Without the stream the pages keep polling every 10s
+        for page in ('dashboard', 'room_rack'):
+            self.assertContains(self.client.get(reverse(page)), 'every 10s [!liveEventsOpen]')
+
+    def test_requires_manager(self):
+        self.assertEqual(self.client.get(reverse('live_events')).status_code, 403)
+
+
+class GuestPdfCacheTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(PDF_CACHE_DIR=self.tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+        self.guest = GuestRegistration.objects.create(first_name="JUAN", last_name="CRUZ", address="X", phone="1")
+        self.url = reverse('generate_guest_pdf', args=[self.guest.id])
+
+    @mock.patch('management.views.render_pdf', return_value=b'%PDF-1.7 guest')
+    def test_unchanged_guest_served_from_cache(self, html):
+
+        first = self.client.get(self.url)
+        self.assertEqual(first.content, b'%PDF-1.7 guest')
+        etag = first['ETag']
+
+        second = self.client.get(self.url)
+        self.assertEqual(second.content, b'%PDF-1.7 guest')
+        self.assertEqual(html.call_count, 1)
+
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+
+        self.guest.room_number = "101"
+        self.guest.save()
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+        self.assertEqual(html.call_count, 2)
+
+    def test_lru_eviction(self):
+        for key in ('a', 'b', 'c'):
+            pdf_cache.put(key, b'x' * 100)
+        pdf_cache.get('a')  # refresh 'a' so 'b' is the oldest
+        old = os.path.getmtime(os.path.join(self.tmp.name, 'b.pdf')) - 10
+        os.utime(os.path.join(self.tmp.name, 'b.pdf'), (old, old))
+
+        pdf_cache.evict(max_bytes=200)
+        self.assertIsNone(pdf_cache.get('b'))
+        self.assertIsNotNone(pdf_cache.get('a'))
+        self.assertIsNotNone(pdf_cache.get('c'))
+
+
+class BatchPrintTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(PDF_CACHE_DIR=self.tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+        today = timezone.localdate()
+        for name in ("ANA", "BEN"):
+            GuestRegistration.objects.create(first_name=name, last_name="CRUZ", address="X", phone="1",
+                                             check_in_date=today, status='PRINTED')
+        GuestRegistration.objects.create(first_name="CARL", last_name="CRUZ", address="X", phone="1",
+                                         check_in_date=today + timedelta(days=1))
+        self.url = reverse('print_batch')
+
+    @mock.patch('management.views.render_pdf', return_value=b'%PDF-1.7 batch')
+    def test_todays_check_ins_in_one_render(self, render):
+        response = self.client.get(self.url)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.7 batch')
+        html = render.call_args[0][0]
+        self.assertIn("ANA", html)
+        self.assertIn("BEN", html)
+        self.assertNotIn("CARL", html)
+        self.assertEqual(html.count('class="registration-page"'), 2)
+
+        again = self.client.get(self.url)
+        self.assertEqual(b''.join(again.streaming_content), b'%PDF-1.7 batch')
+        self.assertEqual(render.call_count, 1)
+
+    @mock.patch('management.views.render_pdf', return_value=b'%PDF-1.7 batch')
+    def test_status_filter(self, render):
+        self.client.get(self.url, {'status': 'PENDING'})
+        html = render.call_args[0][0]
+        self.assertIn("CARL", html)
+        self.assertNotIn("ANA", html)
+
+    def test_rejects_bad_filters(self):
+        self.assertEqual(self.client.get(self.url, {'status': 'NOPE'}).status_code, 400)
+        for bad_date in ('2020-02-30', 'tomorrow', '2020-1'):
+            self.assertEqual(self.client.get(self.url, {'date': bad_date}).status_code, 400, bad_date)
+        self.assertEqual(self.client.get(self.url, {'date': '2001-01-01'}).status_code, 404)
+
+    @override_settings(PDF_BATCH_LIMIT=2)
+    @mock.patch('management.views.render_pdf', return_value=b'%PDF-1.7 batch')
+    def test_oversized_batch_is_refused_not_cut(self, render):
+        response = self.client.get(self.url, {'status': 'PRINTED'})
+        self.assertEqual(response.status_code, 200)
+        GuestRegistration.objects.create(first_name="DAN", last_name="CRUZ", address="X", phone="1", status='PRINTED')
+        response = self.client.get(self.url, {'status': 'PRINTED'})
+        self.assertEqual(response.status_code, 400)
+        self.assertContains(response, '3 registrations match', status_code=400)
+        self.assertEqual(render.call_count, 1)
+
+
+class PdfEngineTest(TestCase):
+    def test_stylesheets_parsed_once(self):
+        engine = PdfEngine()
+        path = stylesheet_path('guest_registration.css')
+        self.assertTrue(engine.render('<p>Hello</p>', '.', [path]).startswith(b'%PDF'))
+        sheet = engine.stylesheet(path)
+        engine.render('<p>Again</p>', '.', [path])
+        self.assertIs(engine.stylesheet(path), sheet)
+
+    def test_pdf_stylesheets_exist(self):
+        for name in PDF_STYLESHEETS:
+            self.assertTrue(os.path.exists(stylesheet_path(name)), name)
+
+
+class PdfRenderPoolTest(TestCase):
+    def test_renders_in_worker_process(self):
+        pool = PdfRenderPool(workers=1, queue_size=2, timeout=120)
+        self.addCleanup(pool._reset)
+        self.assertTrue(pool.render('<p>Hello</p>', '.').startswith(b'%PDF'))
+
+    def test_full_queue_fails_fast(self):
+        pool = PdfRenderPool(workers=0, queue_size=1, timeout=5)
+        slot = pool.slots.acquire()
+        self.addCleanup(pool.slots.release, slot)
+        with self.assertRaises(PdfRendererBusy):
+            pool.render('<p>Hello</p>', '.')
+
+    def test_one_slot_shared_by_two_processes(self):
+        # Two TieredCaches over one SQLite file stand in for two web workers
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        shared = {'BACKEND': 'kegama_residences.cache.SQLiteCache', 'LOCATION': os.path.join(tmp.name, 'cache.sqlite3')}
+        a, b = (PdfRenderPool(workers=0, queue_size=1, timeout=5, cache=TieredCache('', {'OPTIONS': {'SHARED': shared}}))
+                for _ in range(2))
+
+        def render_while_b_tries(*args):
+            with self.assertRaises(PdfRendererBusy):
+                b.render('<p>B</p>', '.')
+            return b'%PDF a'
+
+        with mock.patch('management.pdf._render_html', side_effect=render_while_b_tries):
+            self.assertEqual(a.render('<p>A</p>', '.'), b'%PDF a')
+        # A's slot is free again once its render is done
+        with mock.patch('management.pdf._render_html', return_value=b'%PDF b'):
+            self.assertEqual(b.render('<p>B</p>', '.'), b'%PDF b')
+
+    @mock.patch('management.views.render_pdf', side_effect=PdfRendererBusy)
+    def test_busy_renderer_returns_503(self, render):
+        session = self.client.session
+        session['is_manager'] = True
+        session.save()
+        response = self.client.get(reverse('print_analytics'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
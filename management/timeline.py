@@ -0,0 +1,97 @@
+from datetime import timedelta
+from typing import NamedTuple
+
+from .catalog import get_catalog
+from .intervals import get_stay_index
+from .pagination import month_bounds
+
+MAX_MONTHS = 12
+
+
+class Bar(NamedTuple):
+    """One day of a stay's bar on the timeline."""
+    stay: object
+    starts: bool  # check-in day
+    ends: bool  # last night (occupancy.last_night)
+    label: bool  # first day the bar is visible in the range
+    span: int  # days the bar still covers in the range, this one included
+
+
+class Cell(NamedTuple):
+    day: object
+    bars: tuple
+
+
+class TimelineRow(NamedTuple):
+    room: object
+    cells: list
+
+
+def days_between(start, end):
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def build_timeline(start, end, rooms=None, stays=None):
+    """
+    Rows of day cells for start..end (inclusive), one row per room in order,
+    each cell holding the bars of the stays that occupy it. Work is linear in
+    rooms x days plus booked nights, so templates only walk rows and cells.
+    `stays` is {room_number: [Stay, ...]}, by default from the stay index.
+    """
+    if rooms is None:
+        rooms = get_catalog().rooms()
+    if stays is None:
+        stays = get_stay_index().stays_between(start, end)
+    days = days_between(start, end)
+
+    rows = []
+    for room in rooms:
+        bars = [[] for _ in days]
+        for stay in stays.get(room.number, ()):
+            lo = (max(stay.check_in_date, start) - start).days
+            hi = (min(stay.end_night, end) - start).days
+            for i in range(lo, hi + 1):
+                bars[i].append(Bar(
+                    stay=stay,
+                    starts=days[i] == stay.check_in_date,
+                    ends=days[i] == stay.end_night,
+                    label=i == lo,
+                    span=hi - i + 1,
+                ))
+        rows.append(TimelineRow(room, [Cell(day, tuple(day_bars)) for day, day_bars in zip(days, bars)]))
+    return rows
+
+
+def add_months(day, months):
+    """First of the month `months` after (or before, if negative) day's month."""
+    year, month = divmod(day.year * 12 + day.month - 1 + months, 12)
+    return day.replace(year=year, month=month + 1, day=1)
+
+
+def month_ranges(first_month, months):
+    """(first day, last day) for `months` consecutive months from first_month."""
+    ranges = []
+    month_start = first_month.replace(day=1)
+    for _ in range(months):
+        month_start, next_month = month_bounds(month_start)
+        ranges.append((month_start, next_month - timedelta(days=1)))
+        month_start = next_month
+    return ranges
+
+
+def month_timelines(first_month, months, rooms=None):
+    """
+    Yields {'current_month', 'days_range', 'timeline'} for each month of a
+    multi-month range. Rooms and stays are read once for the whole range;
+    each month's rows are built only when the caller gets to it.
+    """
+    ranges = month_ranges(first_month, months)
+    if rooms is None:
+        rooms = get_catalog().rooms()
+    stays = get_stay_index().stays_between(ranges[0][0], ranges[-1][1])
+    for start, end in ranges:
+        yield {
+            'current_month': start,
+            'days_range': days_between(start, end),
+            'timeline': build_timeline(start, end, rooms, stays),
+        }
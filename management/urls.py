@@ -14,14 +14,21 @@ urlpatterns = [
     path(f'{MGMT_PREFIX}login/', views.admin_login, name='admin_login'),
     path(f'{MGMT_PREFIX}logout/', views.logout_view, name='logout'),
     path(f'{MGMT_PREFIX}dashboard/', views.dashboard, name='dashboard'),
+    path(f'{MGMT_PREFIX}dashboard/month/', views.dashboard_month, name='dashboard_month'),
     path(f'{MGMT_PREFIX}rooms/', views.room_rack, name='room_rack'),
+    path(f'{MGMT_PREFIX}events/', views.live_events, name='live_events'),
     path(f'{MGMT_PREFIX}rooms/clean/', views.mark_room_clean, name='mark_room_clean'),
     path(f'{MGMT_PREFIX}rooms/manage/', views.room_management, name='room_management'),
     path(f'{MGMT_PREFIX}analytics/', views.analytics_dashboard, name='analytics_dashboard'),
     path(f'{MGMT_PREFIX}analytics/print/', views.print_analytics, name='print_analytics'),
+    path(f'{MGMT_PREFIX}api/analytics/', views.analytics_api, name='analytics_api'),
+    path(f'{MGMT_PREFIX}api/availability/', views.availability_api, name='availability_api'),
+    path(f'{MGMT_PREFIX}export/<slug:dataset>/', views.export_data, name='export_data'),
     path(f'{MGMT_PREFIX}settings/', views.settings_page, name='settings_page'),
     path(f'{MGMT_PREFIX}calendar/', views.calendar_view, name='calendar_view'),
     path(f'{MGMT_PREFIX}calendar/print/', views.print_timeline, name='print_timeline'),
+    path(f'{MGMT_PREFIX}calendar/range/', views.timeline_range, name='timeline_range'),
+    path(f'{MGMT_PREFIX}calendar/range/print/', views.print_timeline_range, name='print_timeline_range'),
     path(f'{MGMT_PREFIX}booking/new/', views.new_booking, name='new_booking'),
     path(f'{MGMT_PREFIX}booking/lookup/', views.guest_lookup_page, name='guest_lookup'),
     path(f'{MGMT_PREFIX}booking/clone/<uuid:guest_id>/', views.clone_guest, name='clone_guest'),
@@ -29,5 +36,6 @@ urlpatterns = [
     path(f'{MGMT_PREFIX}update/<uuid:guest_id>/', views.update_guest, name='update_guest'),
     path(f'{MGMT_PREFIX}delete/<uuid:guest_id>/', views.delete_guest, name='delete_guest'),
     path(f'{MGMT_PREFIX}pdf/<uuid:guest_id>/', views.generate_guest_pdf, name='generate_guest_pdf'),
+    path(f'{MGMT_PREFIX}pdf/batch/', views.print_batch, name='print_batch'),
 
 ]
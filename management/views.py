@@ -1,20 +1,41 @@
+import hashlib
 import json
+import uuid
 import calendar as py_calendar
 from datetime import date, datetime, timedelta
+from io import BytesIO
 
-import weasyprint
 from django.conf import settings
-from django.db.models import Sum, Count, F, Q
-from django.db.models.functions import TruncMonth, TruncDate, TruncWeek, TruncYear
-from django.http import HttpResponse
+from django.core.cache import cache
+from django.db.models import F
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.template.loader import render_to_string
-from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date
 from django.views.decorators.http import require_POST
 from django_ratelimit.decorators import ratelimit
 
 from .models import GuestRegistration, AuditLog, Room, AdminSettings
+from .pagination import month_sections, month_bounds, parse_month, keyset_page, decode_cursor
+from .stats import guest_stats, room_stats, invalidate_stats
+from .conditional import conditional_poll, bump_change_version, change_version
+from .search import search, returning_guests, normalize_words
+from .rollup import source_counts
+from .rack import guests_by_room, reconcile_room_statuses
+from .intervals import get_stay_index
+from .catalog import bump_catalog_version, get_catalog
+from .timeline import MAX_MONTHS, add_months, build_timeline, month_timelines
+from . import analytics, availability
+from .events import TOPICS, event_stream, publish
+from . import exports, guest_pdf, pdf_cache, room_updates
+from .pdf import PdfRendererBusy, render_pdf
+
+SEARCH_CACHE_TIMEOUT = 30
+# Where timeline_range.html takes the streamed month sections
+TIMELINE_SECTIONS = '<!-- timeline sections -->'
 
 def log_action(request, action, details):
     ip = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -29,9 +50,36 @@ def log_action(request, action, details):
         ip_address=ip
     )
 
-def cleanup_expired_registrations():
-    expiration_time = timezone.now() - timedelta(hours=1)
-    GuestRegistration.objects.filter(status='PENDING', created_at__lt=expiration_time).delete()
+def filter_guests(query):
+    guests_query = GuestRegistration.objects.all()
+    if query:
+        guests_query = search(query, guests_query)
+    return guests_query
+
+def date_param(request, name):
+    """?<name>=YYYY-MM-DD as a date, or None if absent. Raises ValueError if given but not a date."""
+    raw = request.GET.get(name, '')
+    if not raw:
+        return None
+    day = parse_date(raw)
+    if day is None:
+        raise ValueError(f"Invalid {name} date {raw!r}")
+    return day
+
+def pdf_busy_response():
+    response = HttpResponse("The PDF printer is busy. Please try again in a few seconds.", status=503)
+    response['Retry-After'] = str(settings.PDF_RETRY_AFTER)
+    return response
+
+def pdf_response(html_string, filename, stylesheet):
+    try:
+        pdf_bytes = render_pdf(html_string, stylesheet)
+    except PdfRendererBusy:
+        return pdf_busy_response()
+
+    response = HttpResponse(pdf_bytes, content_type='application/pdf')
+    response['Content-Disposition'] = f'inline; filename="{filename}"'
+    return response
 
 def intro(request):
     if request.session.get('is_owner'):
@@ -163,6 +211,7 @@ def logout_view(request):
     request.session.flush()
     return redirect('admin_login')
 
+@conditional_poll
 def dashboard(request):
     if not request.session.get('is_manager'):
         return redirect('admin_login')
@@ -170,39 +219,24 @@ def dashboard(request):
     if request.session.get('is_owner'):
         return redirect('payslip:index')
     
-    cleanup_expired_registrations()
-    
-    guests_query = GuestRegistration.objects.all().order_by('-created_at')
-    
     query = request.GET.get('q')
-    if query:
-        guests_query = guests_query.filter(
-            Q(first_name__icontains=query) | 
-            Q(last_name__icontains=query) | 
-            Q(room_number__icontains=query) |
-            Q(booking_id__icontains=query)
-        )
+    guests_query = filter_guests(query)
 
-    today = timezone.now().date()
-    
-    stats = {
-        'total': GuestRegistration.objects.count(),
-        'active': GuestRegistration.objects.filter(status='PRINTED', check_out_date__gte=today).count(),
-        'pending': GuestRegistration.objects.filter(status='PENDING').count(),
-        'today_checkins': GuestRegistration.objects.filter(check_in_date=today).count(),
-    }
+    stats = guest_stats()
 
-    grouped_guests = {}
-    for guest in guests_query:
-        month_year = guest.created_at.strftime('%B %Y')
-        if month_year not in grouped_guests:
-            grouped_guests[month_year] = []
-        grouped_guests[month_year].append(guest)
+    # Only the newest month is loaded up front; older sections fetch their
+    # rows page by page through dashboard_month when expanded.
+    sections = month_sections(guests_query)
+    if sections:
+        start, end = month_bounds(sections[0]['month'])
+        sections[0]['guests'], sections[0]['next_cursor'] = keyset_page(
+            guests_query.filter(created_at__gte=start, created_at__lt=end)
+        )
         
     audit_logs = AuditLog.objects.all().order_by('-timestamp')[:8]
     
     context = {
-        'grouped_guests': grouped_guests, 
+        'month_sections': sections, 
         'audit_logs': audit_logs,
         'search_query': query,
         'stats': stats
@@ -213,6 +247,28 @@ def dashboard(request):
         
     return render(request, 'management/dashboard.html', context)
 
+def dashboard_month(request):
+    if not request.session.get('is_manager'):
+        return HttpResponse("", status=403)
+
+    month_start = parse_month(request.GET.get('month'))
+    if month_start is None:
+        return HttpResponse("Invalid month", status=400)
+
+    query = request.GET.get('q')
+    start, end = month_bounds(month_start)
+    guests, next_cursor = keyset_page(
+        filter_guests(query).filter(created_at__gte=start, created_at__lt=end),
+        cursor=decode_cursor(request.GET.get('cursor'))
+    )
+
+    return render(request, 'management/partials/guest_rows.html', {
+        'guests': guests,
+        'next_cursor': next_cursor,
+        'month_key': month_start.strftime('%Y-%m'),
+        'search_query': query,
+    })
+
 def update_guest(request, guest_id):
     if not request.session.get('is_manager'):
         return redirect('admin_login')
@@ -328,6 +384,13 @@ def update_guest(request, guest_id):
                 elif guest.status == 'CHECKED_OUT':
                     Room.objects.filter(number=new_room_number).update(status='DIRTY')
 
+            # Queryset updates above skip post_save, so reset the counters, poll version and room catalog by hand
+            invalidate_stats()
+            bump_change_version()
+            bump_catalog_version()
+            publish('rooms')
+            reconcile_room_statuses()
+
             log_action(request, 'UPDATE_GUEST', f"Updated info for {guest.first_name} {guest.last_name} ({guest.status})")
 
             if is_activating:
@@ -351,17 +414,13 @@ def update_guest(request, guest_id):
         guest.check_out_time = "12:00"
 
     today = timezone.now().date()
-    occupied_today_rooms = GuestRegistration.objects.filter(
-        status='PRINTED',
-        check_in_date__lte=today,
-        check_out_date__gt=today
-    ).exclude(id=guest.id).values_list('room_number', flat=True)
-
-    db_rooms = Room.objects.filter(
-        ~Q(status='MAINTENANCE')
-    ).exclude(
-        Q(number__in=occupied_today_rooms) & ~Q(number=guest.room_number)
-    ).order_by('floor', 'number')
+    stay_index = get_stay_index()
+    occupied_today_rooms = stay_index.booked_rooms(today, today + timedelta(days=1), exclude=guest.id, statuses=('PRINTED',))
+
+    db_rooms = [
+        room for room in get_catalog().rooms(exclude_status='MAINTENANCE')
+        if room.number not in occupied_today_rooms or room.number == guest.room_number
+    ]
     
     room_data = {}
     for room in db_rooms:
@@ -377,13 +436,9 @@ def update_guest(request, guest_id):
 
     conflict_warning = None
     if guest.room_number and guest.check_in_date and guest.check_out_date:
-        overlapping_guests = GuestRegistration.objects.filter(
-            room_number=guest.room_number,
-            check_in_date__lt=guest.check_out_date,
-            check_out_date__gt=guest.check_in_date
-        ).exclude(id=guest.id).exclude(status='CHECKED_OUT')
+        overlapping_guests = stay_index.conflicts(guest.room_number, guest.check_in_date, guest.check_out_date, exclude=guest.id)
 
-        if overlapping_guests.exists():
+        if overlapping_guests:
             conflicts = [f"{g.first_name} {g.last_name} ({g.check_in_date} to {g.check_out_date})" for g in overlapping_guests]
             conflict_warning = f"Warning: Room {guest.room_number} has overlapping booking(s): {', '.join(conflicts)}"
 
@@ -405,8 +460,10 @@ def delete_guest(request, guest_id):
     
     if room_number:
         Room.objects.filter(number=room_number).update(status='AVAILABLE')
+        bump_catalog_version()
     
     guest.delete()
+    reconcile_room_statuses()
     log_action(request, 'DELETE_GUEST', f"Deleted registration for {guest_name}")
     return redirect('dashboard')
 
@@ -414,90 +471,104 @@ def analytics_dashboard(request):
     if not request.session.get('is_manager'):
         return redirect('admin_login')
         
-    total_revenue = GuestRegistration.objects.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-    total_guests = GuestRegistration.objects.count()
+    stats = guest_stats()
     
-    today = timezone.now().date()
-    guests_today = GuestRegistration.objects.filter(check_in_date=today).count()
-    
-    source_query = GuestRegistration.objects.values('source').annotate(count=Count('id'))
-    source_data = list(source_query)
+    source_data = source_counts()
     
     filter_type = request.GET.get('filter', 'daily')
-    chart_data = []
-    
-    if filter_type == 'weekly':
-        start_date = timezone.now() - timedelta(weeks=52)
-        chart_query = GuestRegistration.objects.filter(created_at__gte=start_date).annotate(
-            date=TruncWeek('created_at')
-        ).values('date').annotate(revenue=Sum('total_amount')).order_by('date')
-        
-    elif filter_type == 'monthly':
-        start_date = timezone.now() - timedelta(days=365)
-        chart_query = GuestRegistration.objects.filter(created_at__gte=start_date).annotate(
-            date=TruncMonth('created_at')
-        ).values('date').annotate(revenue=Sum('total_amount')).order_by('date')
-        
-    elif filter_type == 'yearly':
-        start_date = timezone.now() - timedelta(days=365*5)
-        chart_query = GuestRegistration.objects.filter(created_at__gte=start_date).annotate(
-            date=TruncYear('created_at')
-        ).values('date').annotate(revenue=Sum('total_amount')).order_by('date')
-        
-    else:
-        start_date = timezone.now() - timedelta(days=30)
-        chart_query = GuestRegistration.objects.filter(created_at__gte=start_date).annotate(
-            date=TruncDate('created_at')
-        ).values('date').annotate(revenue=Sum('total_amount')).order_by('date')
-    
-    chart_data = list(chart_query)
-    
-    max_revenue = 0
-    if chart_data:
-        max_revenue = max((d['revenue'] or 0) for d in chart_data)
+    if filter_type not in analytics.FILTERS:
+        filter_type = 'daily'
+    chart = analytics.cached_timeseries(*analytics.filter_range(filter_type))
 
     return render(request, 'management/analytics.html', {
-        'total_revenue': total_revenue,
-        'total_guests': total_guests,
-        'guests_today': guests_today,
+        'total_revenue': stats['revenue'],
+        'total_guests': stats['total'],
+        'guests_today': stats['today_checkins'],
         'source_data': source_data,
-        'daily_revenue': chart_data,
-        'max_revenue': max_revenue,
+        'chart': chart,
+        'filter_ranges': {
+            name: dict(zip(('start', 'end', 'granularity'), analytics.filter_range(name)))
+            for name in analytics.FILTERS
+        },
         'current_filter': filter_type,
     })
 
+def analytics_api(request):
+    """Time series for ?start=&end=&granularity=day|week|month|year (defaults: last 30 days by day)."""
+    if not request.session.get('is_manager'):
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+
+    default_start, default_end, _ = analytics.filter_range('daily')
+    try:
+        start = date_param(request, 'start') or default_start
+        end = date_param(request, 'end') or default_end
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date'}, status=400)
+    granularity = request.GET.get('granularity', 'day')
+
+    if granularity not in analytics.GRANULARITIES:
+        return JsonResponse({'error': f"granularity must be one of {', '.join(analytics.GRANULARITIES)}"}, status=400)
+    if start > end:
+        return JsonResponse({'error': 'start must not be after end'}, status=400)
+    if (end - start).days > analytics.MAX_RANGE_DAYS:
+        return JsonResponse({'error': f"Range is limited to {analytics.MAX_RANGE_DAYS} days"}, status=400)
+
+    response = JsonResponse(analytics.cached_timeseries(start, end, granularity))
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+def availability_api(request):
+    """Free rooms for ?check_in=&nights=&hours=6|10|22&pax= (optionally &exclude=<guest id>)."""
+    if not request.session.get('is_manager'):
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+
+    try:
+        check_in = date_param(request, 'check_in') or timezone.localdate()
+        nights = int(request.GET.get('nights') or 1)
+        hours = int(request.GET.get('hours') or 22)
+        pax = int(request.GET.get('pax') or 1)
+        exclude = uuid.UUID(request.GET['exclude']) if request.GET.get('exclude') else None
+    except ValueError:
+        return JsonResponse({'error': 'Invalid parameter'}, status=400)
+
+    if hours not in availability.RATE_FIELDS:
+        return JsonResponse({'error': 'hours must be one of 6, 10, 22'}, status=400)
+    if not 1 <= nights <= availability.MAX_NIGHTS:
+        return JsonResponse({'error': f"nights must be between 1 and {availability.MAX_NIGHTS}"}, status=400)
+    if pax < 1:
+        return JsonResponse({'error': 'pax must be at least 1'}, status=400)
+
+    check_in, check_out, rooms = availability.free_rooms(check_in, nights, hours, pax, exclude)
+    response = JsonResponse({
+        'check_in': check_in,
+        'check_out': check_out,
+        'nights': nights,
+        'hours': hours,
+        'pax': pax,
+        'rooms': rooms,
+    })
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
 def print_analytics(request):
     if not request.session.get('is_manager'):
         return redirect('admin_login')
     
-    total_revenue = GuestRegistration.objects.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-    total_guests = GuestRegistration.objects.count()
+    stats = guest_stats()
     
-    last_year = timezone.now() - timedelta(days=365)
-    monthly_query = GuestRegistration.objects.filter(
-        created_at__gte=last_year
-    ).annotate(
-        month=TruncMonth('created_at')
-    ).values('month').annotate(
-        revenue=Sum('total_amount'),
-        guests=Count('id')
-    ).order_by('month')
-    
-    monthly_data = list(monthly_query)
+    start_date, end_date, _ = analytics.filter_range('monthly')
+    report = analytics.cached_timeseries(start_date, end_date, 'month')
 
     html_string = render_to_string('pdf/analytics_report.html', {
-        'total_revenue': total_revenue,
-        'total_guests': total_guests,
-        'monthly_data': monthly_data,
+        'total_revenue': stats['revenue'],
+        'total_guests': stats['total'],
+        'monthly_data': report['series'],
+        'kpis': report['summary'],
         'generated_at': timezone.now(),
         'base_dir': settings.BASE_DIR,
     })
     
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'inline; filename="revenue_report_{timezone.now().date()}.pdf"'
-    weasyprint.HTML(string=html_string, base_url=str(settings.BASE_DIR)).write_pdf(response)
-    
-    return response
+    return pdf_response(html_string, f"revenue_report_{timezone.now().date()}.pdf", 'analytics_report.css')
 
 def settings_page(request):
     if not request.session.get('is_manager'):
@@ -540,17 +611,15 @@ def settings_page(request):
         'settings': settings_obj
     })
 
+@conditional_poll
 def room_rack(request):
     if not request.session.get('is_manager'):
         return redirect('admin_login')
     
-    active_guests = GuestRegistration.objects.filter(
-        status__in=['PENDING', 'PRINTED']
-    ).order_by('created_at')
-    
-    room_map = {guest.room_number: guest for guest in active_guests if guest.room_number}
+    room_map = guests_by_room()
+    today = timezone.localdate()
 
-    db_rooms = Room.objects.all().order_by('floor', 'number')
+    db_rooms = get_catalog().rooms()
     rack_data = {}
     
     for room in db_rooms:
@@ -558,8 +627,7 @@ def room_rack(request):
             rack_data[room.floor] = []
             
         r_id = room.number
-        db_status = room.status
-        display_status = db_status
+        display_status = room.status
         
         guest = room_map.get(r_id)
         guest_name = ''
@@ -572,16 +640,8 @@ def room_rack(request):
             if guest.status == 'PENDING':
                 display_status = 'PENDING'
             elif guest.status == 'PRINTED':
+                # The stored status is brought in line by reconcile_room_statuses
                 display_status = 'OCCUPIED'
-                today = timezone.now().date()
-                if guest.check_in_date <= today and guest.check_out_date > today:
-                    if db_status == 'AVAILABLE':
-                        room.status = 'OCCUPIED'
-                        room.save()
-                else:
-                    if db_status == 'OCCUPIED':
-                        room.status = 'AVAILABLE'
-                        room.save()
             
         rack_data[room.floor].append({
             'id': r_id,
@@ -589,12 +649,32 @@ def room_rack(request):
             'status': display_status,
             'guest_name': guest_name,
             'guest_id': guest_id,
-            'is_advance': (guest.check_in_date > timezone.now().date()) if guest and guest.check_in_date else False
+            'is_advance': (guest.check_in_date > today) if guest and guest.check_in_date else False
         })
 
-    return render(request, 'management/room_rack.html', {
+    context = {
         'rack_data': rack_data
-    })
+    }
+
+    if request.headers.get('HX-Request'):
+        return render(request, 'management/partials/rack_grid.html', context)
+
+    return render(request, 'management/room_rack.html', context)
+
+async def live_events(request):
+    if not await request.session.aget('is_manager'):
+        return HttpResponse("", status=403)
+
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would be pinned for the whole stream. 204 tells
+        # EventSource not to reconnect; pages fall back to their slow poll.
+        return HttpResponse(status=204)
+
+    topics = [t for t in request.GET.get('topics', '').split(',') if t in TOPICS] or list(TOPICS)
+    response = StreamingHttpResponse(event_stream(topics), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 @require_POST
 def mark_room_clean(request):
@@ -607,6 +687,7 @@ def mark_room_clean(request):
         if room.status == 'DIRTY':
             room.status = 'AVAILABLE'
             room.save()
+            reconcile_room_statuses()
             log_action(request, 'HOUSEKEEPING', f"Marked Room {room_id} as Clean")
     except Room.DoesNotExist:
         pass
@@ -617,49 +698,26 @@ def room_management(request):
     if not request.session.get('is_manager'):
         return redirect('admin_login')
     
+    error = None
     if request.method == 'POST':
-        rooms = Room.objects.all()
-        updated_count = 0
-        
-        for room in rooms:
-            rid = room.number
-            if f'price_{rid}' in request.POST:
-                try:
-                    room.price = float(request.POST.get(f'price_{rid}', '0').replace(',', '') or 0)
-                    room.price_6hr = float(request.POST.get(f'price_6hr_{rid}', '0').replace(',', '') or 0)
-                    room.price_10hr = float(request.POST.get(f'price_10hr_{rid}', '0').replace(',', '') or 0)
-                    room.capacity = int(request.POST.get(f'capacity_{rid}', 1))
-                    room.status = request.POST.get(f'status_{rid}', room.status)
-                    room.save()
-                    updated_count += 1
-                except ValueError:
-                    continue
-        
-        if updated_count > 0:
-            log_action(request, 'UPDATE_ROOMS', f"Bulk updated {updated_count} rooms")
-        
-        return redirect('room_management')
-
-    rooms = Room.objects.all().order_by('floor', 'number')
-    grouped_rooms = {}
-    for room in rooms:
-        floor_name = room.floor
-        if floor_name not in grouped_rooms:
-            grouped_rooms[floor_name] = []
-        grouped_rooms[floor_name].append(room)
-    
-    room_stats = {
-        'total': Room.objects.count(),
-        'available': Room.objects.filter(status='AVAILABLE').count(),
-        'occupied': Room.objects.filter(status='OCCUPIED').count(),
-        'maintenance': Room.objects.filter(status='MAINTENANCE').count(),
-    }
+        try:
+            rows = room_updates.parse_room_rows(request.POST, get_catalog().numbers())
+        except room_updates.RoomUpdateError as e:
+            error = f"No changes saved. {e}"
+        else:
+            room_count, field_count = room_updates.apply_room_updates(rows)
+            if room_count:
+                reconcile_room_statuses()
+                log_action(request, 'UPDATE_ROOMS', f"Bulk updated {room_count} rooms ({field_count} fields changed)")
+            return redirect('room_management')
 
     return render(request, 'management/manage_rooms.html', {
-        'grouped_rooms': grouped_rooms,
-        'room_stats': room_stats
+        'grouped_rooms': get_catalog().by_floor(),
+        'room_stats': room_stats(),
+        'error': error,
     })
 
+@conditional_poll
 def calendar_view(request):
     if not request.session.get('is_manager'):
         return redirect('admin_login')
@@ -673,47 +731,17 @@ def calendar_view(request):
     last_day = date(year, month, num_days)
     days_range = [date(year, month, d) for d in range(1, num_days + 1)]
     
-    rooms = Room.objects.all().order_by('floor', 'number')
-    
-    guests = GuestRegistration.objects.filter(
-        check_in_date__lte=last_day,
-        check_out_date__gte=first_day
-    ).exclude(status='CHECKED_OUT').exclude(room_number='')
-
-    booking_map = {}
-    for guest in guests:
-        if guest.room_number not in booking_map:
-            booking_map[guest.room_number] = []
-        
-        is_nightly = '22' in str(guest.stay_duration)
-        
-        if is_nightly:
-            last_night = guest.check_out_date
-        else:
-            if guest.check_in_date == guest.check_out_date:
-                last_night = guest.check_in_date
-            else:
-                last_night = guest.check_out_date - timedelta(days=1)
-        
-        guest.start_date = guest.check_in_date
-        guest.end_night = last_night
-        booking_map[guest.room_number].append(guest)
+    stay_index = get_stay_index()
+    timeline = build_timeline(first_day, last_day)
 
-    for room in rooms:
-        room.is_occupied_today = False
-        if room.number in booking_map:
-            for g in booking_map[room.number]:
-                # Room is occupied if today is within the range [check_in, check_out]
-                if g.check_in_date <= today and today <= g.end_night:
-                    room.is_occupied_today = True
-                    break
+    for row in timeline:
+        row.room.is_occupied_today = not stay_index.is_free(row.room.number, today, today)
         
     context = {
         'days_range': days_range,
-        'rooms': rooms,
+        'timeline': timeline,
         'current_month': first_day,
         'today': today,
-        'booking_map': booking_map,
         'prev_month': (first_day - timedelta(days=1)),
         'next_month': (last_day + timedelta(days=1)),
     }
@@ -732,46 +760,84 @@ def print_timeline(request):
     last_day = date(year, month, num_days)
     days_range = [date(year, month, d) for d in range(1, num_days + 1)]
     
-    rooms = Room.objects.all().order_by('floor', 'number')
-    guests = GuestRegistration.objects.filter(
-        check_in_date__lte=last_day,
-        check_out_date__gte=first_day
-    ).exclude(status='CHECKED_OUT').exclude(room_number='')
-
-    booking_map = {}
-    for guest in guests:
-        if guest.room_number not in booking_map:
-            booking_map[guest.room_number] = []
-        
-        is_nightly = '22' in str(guest.stay_duration)
-        
-        if is_nightly:
-            last_night = guest.check_out_date
-        else:
-            if guest.check_in_date == guest.check_out_date:
-                last_night = guest.check_in_date
-            else:
-                last_night = guest.check_out_date - timedelta(days=1)
-        
-        guest.start_date = guest.check_in_date
-        guest.end_night = last_night
-        booking_map[guest.room_number].append(guest)
-
     html_string = render_to_string('pdf/timeline_report.html', {
         'days_range': days_range,
-        'rooms': rooms,
-        'booking_map': booking_map,
+        'timeline': build_timeline(first_day, last_day),
         'current_month': first_day,
         'base_dir': settings.BASE_DIR,
         'generated_at': timezone.now()
     })
     
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'inline; filename="timeline_{year}_{month}.pdf"'
-    weasyprint.HTML(string=html_string, base_url=str(settings.BASE_DIR)).write_pdf(response)
-    
+    return pdf_response(html_string, f"timeline_{year}_{month}.pdf", 'timeline_report.css')
+
+def timeline_range_params(request):
+    """(first month, number of months) from ?start=YYYY-MM&months=N; defaults to three months from this one."""
+    try:
+        # A plain date: the clamp below handles months parse_month would reject
+        first_month = datetime.strptime(request.GET.get('start', ''), '%Y-%m').date()
+    except ValueError:
+        first_month = timezone.localdate().replace(day=1)
+    try:
+        months = int(request.GET.get('months', 3))
+    except ValueError:
+        months = 3
+    months = min(max(months, 1), MAX_MONTHS)
+    # Keep the range and its previous/next links between date.min and date.max
+    first_month = min(max(first_month, add_months(date.min, months)), add_months(date.max, -months))
+    return first_month, months
+
+def timeline_range(request):
+    """
+    The calendar for a quarter or a year on one page. The page shell goes out
+    first, then each month's grid as soon as it is rendered.
+    """
+    if not request.session.get('is_manager'):
+        return redirect('admin_login')
+
+    today = timezone.localdate()
+    first_month, months = timeline_range_params(request)
+    rooms = get_catalog().rooms()
+    stay_index = get_stay_index()
+    for room in rooms:
+        room.is_occupied_today = not stay_index.is_free(room.number, today, today)
+
+    page = render_to_string('management/timeline_range.html', {
+        'first_month': first_month,
+        'last_month': add_months(first_month, months - 1),
+        'prev_start': add_months(first_month, -months),
+        'next_start': add_months(first_month, months),
+        'months': months,
+        'sections_marker': TIMELINE_SECTIONS,
+    }, request=request)
+    head, tail = page.split(TIMELINE_SECTIONS, 1)
+
+    def parts():
+        yield head
+        for month in month_timelines(first_month, months, rooms):
+            yield render_to_string('management/partials/timeline_month.html', {**month, 'today': today})
+        yield tail
+
+    # One chunk per month; under ASGI a plain generator would be buffered whole
+    chunks = exports.achunked(parts(), size=1) if isinstance(request, ASGIRequest) else parts()
+    response = StreamingHttpResponse(chunks, content_type='text/html; charset=utf-8')
+    patch_cache_control(response, private=True, no_cache=True)
     return response
 
+def print_timeline_range(request):
+    if not request.session.get('is_manager'):
+        return redirect('admin_login')
+
+    first_month, months = timeline_range_params(request)
+    html_string = render_to_string('pdf/timeline_range_report.html', {
+        'months': list(month_timelines(first_month, months)),
+        'first_month': first_month,
+        'last_month': add_months(first_month, months - 1),
+        'base_dir': settings.BASE_DIR,
+        'generated_at': timezone.now()
+    })
+
+    return pdf_response(html_string, f"timeline_{first_month:%Y_%m}_{months}m.pdf", 'timeline_report.css')
+
 def new_booking(request):
     if not request.session.get('is_manager'):
         return redirect('admin_login')
@@ -826,75 +892,115 @@ def search_guests(request):
     if len(query) < 2:
         return HttpResponse("")
         
-    guests = GuestRegistration.objects.filter(
-        Q(first_name__icontains=query) | 
-        Q(last_name__icontains=query) |
-        Q(phone__icontains=query)
-    ).values('id', 'first_name', 'last_name', 'phone', 'address', 'created_at').order_by('-created_at')[:10]
-    
-    seen = set()
-    unique_guests = []
-    for g in guests:
-        key = (g['first_name'], g['last_name'], g['phone'])
-        if key not in seen:
-            seen.add(key)
-            unique_guests.append(g)
-    
-    if not unique_guests:
-        return HttpResponse('<div class="p-6 text-center text-xs font-bold text-gray-400 uppercase tracking-widest bg-white rounded-xl border border-dashed border-gray-200">No guests found</div>')
-        
-    html = ""
-    for g in unique_guests:
-        clone_url = reverse('clone_guest', args=[g['id']])
-        html += f"""
-        <a href="{clone_url}" class="block bg-white p-4 rounded-xl border border-gray-100 shadow-sm hover:shadow-md hover:border-orange-200 transition-all group">
-            <div class="flex justify-between items-center">
-                <div>
-                    <h3 class="font-black text-sm text-gray-900 uppercase group-hover:text-orange-600 transition-colors">{g['first_name']} {g['last_name']}</h3>
-                    <p class="text-[10px] font-bold text-gray-400 mt-1">{g['address']}</p>
-                </div>
-                <div class="text-right">
-                    <div class="text-[10px] font-mono font-bold text-gray-500">{g['phone']}</div>
-                    <span class="text-[9px] font-bold text-orange-500 uppercase tracking-wider opacity-0 group-hover:opacity-100 transition-opacity">Select &rarr;</span>
-                </div>
-            </div>
-        </a>
-        """
+    # Keyed on the change version so any write retires every cached result
+    query_hash = hashlib.sha1(' '.join(normalize_words(query)).encode()).hexdigest()
+    cache_key = f"guest-search:{change_version()}:{query_hash}"
+    html = cache.get(cache_key)
+    if html is None:
+        html = render_to_string('management/partials/guest_search_results.html', {
+            'guests': returning_guests(query)
+        })
+        cache.set(cache_key, html, SEARCH_CACHE_TIMEOUT)
     return HttpResponse(html)
 
+def export_data(request, dataset):
+    """Streams guests or the audit log as ?format=csv|jsonl, filtered by ?start=&end=&status= (or &action=)."""
+    if not request.session.get('is_manager'):
+        return redirect('admin_login')
+
+    fmt = request.GET.get('format', 'csv')
+    try:
+        start = date_param(request, 'start')
+        end = date_param(request, 'end')
+        value = request.GET.get('status') or request.GET.get('action') or None
+        columns, rows = exports.export_rows(dataset, start=start, end=end, value=value)
+        lines = exports.render_lines(fmt, columns, rows)
+    except ValueError as e:
+        return HttpResponse(str(e), status=400)
+
+    log_action(request, 'EXPORT_DATA', f"Exported {dataset} ({fmt}) {start or 'beginning'} to {end or 'today'}")
+
+    chunks = exports.achunked(lines) if isinstance(request, ASGIRequest) else exports.chunked(lines)
+    response = StreamingHttpResponse(chunks, content_type=exports.FORMATS[fmt])
+    filename = f"{dataset}_{start or 'all'}_{end or timezone.localdate()}.{fmt}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
 def generate_guest_pdf(request, guest_id):
     if not request.session.get('is_manager'):
         return redirect('admin_login')
 
     guest = get_object_or_404(GuestRegistration, id=guest_id)
     log_action(request, 'PRINT_PDF', f"Generated PDF for {guest.first_name} {guest.last_name}")
-    
+
+    settings_obj = AdminSettings.load()
+
+    etag = guest_pdf.guest_key(guest, settings_obj.policy_text, timezone.localdate())
+    quoted_etag = f'"{etag}"'
+
+    response = get_conditional_response(request, etag=quoted_etag)
+    if response is None:
+        pdf_bytes = pdf_cache.get(etag)
+        if pdf_bytes is None:
+            html_string = guest_pdf.render_html(guest, settings_obj.policy_text)
+            try:
+                pdf_bytes = render_pdf(html_string, guest_pdf.STYLESHEET)
+            except PdfRendererBusy:
+                return pdf_busy_response()
+            pdf_cache.put(etag, pdf_bytes)
+
+        response = HttpResponse(pdf_bytes, content_type='application/pdf')
+        response['Content-Disposition'] = f'inline; filename="guest_{guest.id}.pdf"'
+
+    response['ETag'] = quoted_etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+def print_batch(request):
+    """
+    Every registration checking in on ?date= (default today) and/or in
+    ?status=, merged into one PDF laid out in a single WeasyPrint pass.
+    """
+    if not request.session.get('is_manager'):
+        return redirect('admin_login')
+
+    status = request.GET.get('status', '')
+    if status and status not in dict(GuestRegistration.STATUS_CHOICES):
+        return HttpResponse("Unknown status", status=400)
+    raw_date = request.GET.get('date', '')
     try:
-        requests_list = json.loads(guest.additional_requests)
-    except:
-        requests_list = []
+        day = parse_date(raw_date)
+    except ValueError:
+        day = None
+    if raw_date and day is None:
+        return HttpResponse("Invalid date", status=400)
+    if day is None and not status:
+        day = timezone.localdate()
+
+    try:
+        guests = guest_pdf.batch_guests(day=day, status=status)
+    except guest_pdf.BatchTooLarge as e:
+        return HttpResponse(f"{e}. Narrow it down with a date.", status=400)
+    if not guests:
+        return HttpResponse("No registrations match this batch.", status=404)
 
-    room_rate = float(guest.room_rate or 0)
-    nights = int(guest.nights or 1)
-    room_total = room_rate * nights
-    requests_total = sum(float(r.get('price', 0)) for r in requests_list)
-    grand_total = room_total + requests_total
+    log_action(request, 'PRINT_PDF', f"Batch printed {len(guests)} registration forms")
 
     settings_obj = AdminSettings.load()
+    key = guest_pdf.batch_key(guests, settings_obj.policy_text, timezone.localdate())
 
-    html_string = render_to_string('pdf/guest_registration.html', {
-        'guest': guest,
-        'base_dir': settings.BASE_DIR,
-        'requests_list': requests_list,
-        'room_total': room_total,
-        'requests_total': requests_total,
-        'grand_total': grand_total,
-        'now': timezone.now(),
-        'policy_text': settings_obj.policy_text
-    })
-    
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'inline; filename="guest_{guest.id}.pdf"'
-    weasyprint.HTML(string=html_string, base_url=str(settings.BASE_DIR)).write_pdf(response)
-    
-    return response
\ No newline at end of file
+    pdf_file = pdf_cache.open_file(key)
+    if pdf_file is None:
+        html_string = guest_pdf.render_batch_html(guests, settings_obj.policy_text)
+        try:
+            pdf_bytes = render_pdf(html_string, guest_pdf.STYLESHEET)
+        except PdfRendererBusy:
+            return pdf_busy_response()
+        pdf_cache.put(key, pdf_bytes)
+        pdf_file = pdf_cache.open_file(key) or BytesIO(pdf_bytes)
+
+    label = day.isoformat() if day else 'all'
+    if status:
+        label += f"_{status.lower()}"
+    # Streamed from the cache file in chunks rather than held in memory
+    return FileResponse(pdf_file, content_type='application/pdf', filename=f"registrations_{label}.pdf")